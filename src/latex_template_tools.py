@@ -7,13 +7,21 @@ using modular LaTeX templates.
 """
 
 import asyncio
+import copy
+import errno
 import json
+import mmap
 import os
+import platform
+import re
+import shutil
 import subprocess
+import sys
 import tempfile
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, FrozenSet, List, Optional, Pattern, Tuple, Union
 import structlog
 
 from .user_config import get_user_config
@@ -21,6 +29,97 @@ from .mcp_error_handler import MCPErrorHandler, CircuitBreaker
 
 logger = structlog.get_logger(__name__)
 
+# Linux ioctl that shares file extents on copy-on-write filesystems (btrfs, XFS).
+# fcntl.FICLONE exists from Python 3.12. Older versions fall back to the
+# _IOW(0x94, 9, int) value, but only on architectures that use the generic ioctl
+# encoding; powerpc, mips, sparc and alpha encode it differently, so they skip cloning.
+_FICLONE: Optional[int] = None
+if sys.platform.startswith("linux"):
+    import fcntl
+    _FICLONE = getattr(fcntl, "FICLONE", None)
+    if _FICLONE is None and re.match(
+        r"(x86_64|amd64|i[3-6]86|aarch64|arm|riscv|s390|loongarch)", platform.machine()
+    ):
+        _FICLONE = 0x40049409
+
+# Prefer orjson for parsing template configs when it is installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on optional orjson install
+    _json_loads = json.loads
+
+# Upper bound on template files read, written or copied at the same time
+_FILE_IO_CONCURRENCY = 32
+
+# Validation results remembered per template, keyed by the set of supplied variable names
+_MAX_CACHED_VALIDATIONS = 256
+
+# Template files at least this large are substituted through a memory map as bytes
+_MMAP_MIN_BYTES = 64 * 1024
+
+# Commands whose output is only correct after a second pdflatex pass
+_MULTI_PASS_COMMAND_RE = re.compile(
+    r"\\(?:label|ref|pageref|eqref|autoref|cite|tableofcontents|listoffigures|listoftables)\b"
+)
+
+
+# Variable name keywords mapped to inferred types, in priority order; each
+# alternative is a lookahead so earlier types win wherever their keyword occurs
+_VARIABLE_TYPE_RE = re.compile(
+    r"^(?:(?P<datetime>(?=.*(?:date|time)))"
+    r"|(?P<integer>(?=.*(?:number|count|total)))"
+    r"|(?P<float>(?=.*(?:score|confidence|percentage))))",
+    re.IGNORECASE | re.DOTALL
+)
+
+# Executables already located on PATH; misses are not cached so later installs are picked up
+_executable_paths: Dict[str, str] = {}
+
+
+def _find_executable(name: str) -> Optional[str]:
+    """Locate an executable on PATH, remembering where it was found."""
+    path = _executable_paths.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path is not None:
+            _executable_paths[name] = path
+    return path
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """Copy a file and its metadata, cloning extents where the filesystem allows.
+    
+    Falls back to ``shutil.copy2``, which already uses ``os.sendfile`` on Linux.
+    """
+    if _FICLONE is not None:
+        try:
+            with open(src, "rb") as src_file, open(dst, "wb") as dst_file:
+                fcntl.ioctl(dst_file.fileno(), _FICLONE, src_file.fileno())
+        except OSError:
+            pass  # Filesystem without reflink support or a cross-device copy
+        else:
+            shutil.copystat(src, dst)
+            return
+    shutil.copy2(src, dst)
+
+
+@lru_cache(maxsize=64)
+def _placeholder_pattern(variable_names: FrozenSet[str]) -> Pattern[str]:
+    """Compile a regex matching ``{{NAME}}`` for any of the given variable names.
+    
+    Longer names are tried first, which keeps backtracking short when one
+    name is a prefix of another.
+    """
+    alternatives = "|".join(map(re.escape, sorted(variable_names, key=len, reverse=True)))
+    return re.compile(r"\{\{(" + alternatives + r")\}\}")
+
+
+@lru_cache(maxsize=64)
+def _placeholder_bytes_pattern(variable_names: FrozenSet[str]) -> Pattern[bytes]:
+    """Bytes counterpart of :func:`_placeholder_pattern` for memory-mapped files."""
+    return re.compile(_placeholder_pattern(variable_names).pattern.encode("utf-8"))
+
 
 class LaTeXTemplateTools:
     """MCP tools for LaTeX template automation and document generation.
@@ -65,6 +164,10 @@ class LaTeXTemplateTools:
             self.circuit_breaker = CircuitBreaker("latex_compilation", error_handler.config.circuit_breaker)
         else:
             self.circuit_breaker = None
+        
+        # Parsed template_info.json plus derived schema parts, keyed by config path
+        # and invalidated when the file's inode, modification time or size changes
+        self._template_cache: Dict[str, Tuple[Tuple[int, int, int, int], Dict[str, Any]]] = {}
     
     def _find_project_root(self) -> Path:
         """Find the project root directory by looking for setup.py or pyproject.toml.
@@ -161,7 +264,8 @@ class LaTeXTemplateTools:
             document_data: Data to populate the template with
             output_format: Output format (pdf, tex, html)
             include_assets: Whether to include template assets
-            compile_options: Additional compilation options
+            compile_options: Additional compilation options (``quiet``, ``shell_escape``,
+                and ``compiler``: ``"pdflatex"`` or ``"tectonic"``)
         
         Returns:
             Document generation results with file paths and metadata
@@ -196,10 +300,11 @@ class LaTeXTemplateTools:
                 }
             
             # Load template configuration
-            template_config = self._load_template_config(template_path)
+            template_entry = self._load_template_entry(template_path)
+            template_config = template_entry["config"]
             
-            # Validate required data
-            validation_result = self._validate_document_data(document_data, template_config)
+            # Validate required data, reusing the result of a preceding validate_document_data call
+            validation_result = self._validate_with_cache(template_entry, document_data)
             if not validation_result["valid"]:
                 if self.error_handler:
                     return {"error": self.error_handler.create_validation_error("document_data", f"Invalid document data: {validation_result['errors']}")}
@@ -214,7 +319,7 @@ class LaTeXTemplateTools:
                 temp_path = Path(temp_dir)
                 
                 # Copy template files
-                self._copy_template_files(template_path, temp_path, include_assets)
+                await self._copy_template_files(template_path, temp_path, include_assets)
                 
                 # Generate document content
                 generated_files = await self._generate_document_content(
@@ -234,7 +339,7 @@ class LaTeXTemplateTools:
                         }
                     
                     # Copy output files
-                    output_files = self._copy_output_files(temp_path, template_name)
+                    output_files = await self._copy_output_files(temp_path, template_name)
                     
                     # Record success with circuit breaker
                     self._record_circuit_breaker_success()
@@ -306,8 +411,7 @@ class LaTeXTemplateTools:
                     template_config_path = item / "template_info.json"
                     if template_config_path.exists():
                         try:
-                            with open(template_config_path, 'r') as f:
-                                config = json.load(f)
+                            config = self._load_template_config(item)
                             
                             templates.append({
                                 "name": item.name,
@@ -326,8 +430,7 @@ class LaTeXTemplateTools:
             current_config_path = self.template_base_path / "template_info.json"
             if current_config_path.exists():
                 try:
-                    with open(current_config_path, 'r') as f:
-                        config = json.load(f)
+                    config = self._load_template_config(self.template_base_path)
                     
                     templates.append({
                         "name": self.template_base_path.name,
@@ -381,19 +484,21 @@ class LaTeXTemplateTools:
                     "schema": None
                 }
             
-            template_config = self._load_template_config(template_path)
+            template_entry = self._load_template_entry(template_path)
+            template_config = template_entry["config"]
             
-            # Build schema from template configuration
-            schema = {
+            # Build schema from template configuration, copied so callers
+            # cannot alter the cached entry
+            schema = copy.deepcopy({
                 "template_name": template_config.get("template_name", template_name),
                 "version": template_config.get("version", "1.0"),
                 "description": template_config.get("description", ""),
                 "sections": template_config.get("sections", []),
                 "required_variables": template_config.get("required_variables", {}),
-                "variable_types": self._infer_variable_types(template_config),
-                "section_descriptions": self._get_section_descriptions(template_path),
-                "example_data": self._generate_example_data(template_config)
-            }
+                "variable_types": template_entry["variable_types"],
+                "section_descriptions": template_entry["section_descriptions"],
+                "example_data": template_entry["example_data"]
+            })
             
             return {
                 "success": True,
@@ -438,8 +543,8 @@ class LaTeXTemplateTools:
                     "validation": None
                 }
             
-            template_config = self._load_template_config(template_path)
-            validation_result = self._validate_document_data(document_data, template_config)
+            template_entry = self._load_template_entry(template_path)
+            validation_result = self._validate_with_cache(template_entry, document_data)
             
             return {
                 "success": True,
@@ -478,15 +583,75 @@ class LaTeXTemplateTools:
             template_path: Path to the template directory
         
         Returns:
-            Template configuration dictionary
+            Template configuration dictionary, copied from the cache
 
         """
+        return copy.deepcopy(self._load_template_entry(template_path)["config"])
+    
+    def _load_template_entry(self, template_path: Path) -> Dict[str, Any]:
+        """Load template configuration and its derived schema parts, using the cache.
+        
+        The entry is rebuilt only when ``template_info.json``'s inode,
+        modification time or size differs from when it was cached. The entry
+        itself is shared, so callers must not mutate it.
+        
+        Args:
+            template_path: Path to the template directory
+        
+        Returns:
+            Dictionary with ``config``, ``variable_types``, ``section_descriptions``,
+            ``example_data`` and ``validations`` keys
+        
+        Raises:
+            FileNotFoundError: If the template has no template_info.json
+        """
         config_path = template_path / "template_info.json"
-        if not config_path.exists():
+        try:
+            st = config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Template config not found: {config_path}")
         
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        # Identify the file revision so unchanged files are not re-parsed
+        file_key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+        cache_key = str(config_path)
+        cached = self._template_cache.get(cache_key)
+        if cached is not None and cached[0] == file_key:
+            return cached[1]
+        
+        template_config = _json_loads(config_path.read_bytes())
+        entry = {
+            "config": template_config,
+            "variable_types": self._infer_variable_types(template_config),
+            "section_descriptions": self._get_section_descriptions(template_path),
+            "example_data": self._generate_example_data(template_config),
+            "validations": {}
+        }
+        self._template_cache[cache_key] = (file_key, entry)
+        return entry
+    
+    def _validate_with_cache(self, template_entry: Dict[str, Any], document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate document data, reusing earlier results for the same template.
+        
+        Validation only looks at which variables are supplied, so results are
+        keyed by the set of variable names and dropped with the template entry
+        when template_info.json changes.
+        
+        Args:
+            template_entry: Cached template entry from ``_load_template_entry``
+            document_data: Document data to validate
+        
+        Returns:
+            Validation results, copied so callers cannot alter the cached entry
+        """
+        validations = template_entry["validations"]
+        key = frozenset(document_data)
+        result = validations.get(key)
+        if result is None:
+            result = self._validate_document_data(document_data, template_entry["config"])
+            if len(validations) >= _MAX_CACHED_VALIDATIONS:
+                del validations[next(iter(validations))]
+            validations[key] = result
+        return {name: list(value) if isinstance(value, list) else value for name, value in result.items()}
     
     def _validate_document_data(
         self,
@@ -552,24 +717,30 @@ class LaTeXTemplateTools:
             List of generated file paths
 
         """
-        generated_files = []
+        template_files = []
         
-        # Process main document files
+        # Main document files
         main_files = ["main_report.tex", "document_body.tex", "preamble.tex"]
         for file_name in main_files:
             file_path = temp_path / file_name
             if file_path.exists():
-                await self._process_template_file(file_path, document_data)
-                generated_files.append(str(file_path))
+                template_files.append(file_path)
         
-        # Process section files
+        # Section files
         sections_dir = temp_path / "sections"
         if sections_dir.exists():
-            for section_file in sections_dir.glob("*.tex"):
-                await self._process_template_file(section_file, document_data)
-                generated_files.append(str(section_file))
+            template_files.extend(sections_dir.glob("*.tex"))
         
-        return generated_files
+        # Files are independent, so process them concurrently
+        semaphore = asyncio.Semaphore(_FILE_IO_CONCURRENCY)
+        
+        async def _process(file_path: Path) -> None:
+            async with semaphore:
+                await self._process_template_file(file_path, document_data)
+        
+        await asyncio.gather(*(_process(file_path) for file_path in template_files))
+        
+        return [str(file_path) for file_path in template_files]
     
     async def _process_template_file(
         self,
@@ -583,7 +754,11 @@ class LaTeXTemplateTools:
             document_data: Data to substitute
 
         """
-        try:
+        def _process() -> None:
+            if file_path.stat().st_size >= _MMAP_MIN_BYTES:
+                self._substitute_file_mmap(file_path, document_data)
+                return
+            
             with open(file_path, 'r') as f:
                 content = f.read()
             
@@ -592,11 +767,42 @@ class LaTeXTemplateTools:
             
             with open(file_path, 'w') as f:
                 f.write(processed_content)
-                
+        
+        try:
+            # Read, substitute and write in a worker thread to keep the event loop free
+            await asyncio.get_running_loop().run_in_executor(None, _process)
         except Exception as e:
             logger.error(f"Failed to process template file {file_path}: {e}")
             raise
     
+    def _substitute_file_mmap(self, file_path: Path, document_data: Dict[str, Any]) -> None:
+        """Substitute variables in a large template file without decoding it.
+        
+        The file is scanned as UTF-8 bytes through a read-only memory map and
+        only rewritten when it contains a placeholder.
+        
+        Args:
+            file_path: Path to the template file
+            document_data: Data to substitute
+
+        """
+        if not document_data:
+            return
+        
+        values = {
+            str(var_name).encode("utf-8"): (var_value if isinstance(var_value, str) else str(var_value)).encode("utf-8")
+            for var_name, var_value in document_data.items()
+        }
+        pattern = _placeholder_bytes_pattern(frozenset(name.decode("utf-8") for name in values))
+        
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if pattern.search(mapped) is None:
+                return
+            processed_content = pattern.sub(lambda match: values[match.group(1)], mapped)
+        
+        with open(file_path, 'wb') as f:
+            f.write(processed_content)
+    
     def _substitute_variables(self, content: str, document_data: Dict[str, Any]) -> str:
         """Substitute variables in template content.
         
@@ -608,17 +814,18 @@ class LaTeXTemplateTools:
             Processed content with variables substituted
 
         """
-        # Simple variable substitution - replace {{VARIABLE_NAME}} with values
-        for var_name, var_value in document_data.items():
-            placeholder = f"{{{{{var_name}}}}}"
-            if isinstance(var_value, str):
-                content = content.replace(placeholder, var_value)
-            else:
-                content = content.replace(placeholder, str(var_value))
+        if not document_data:
+            return content
         
-        return content
+        # Replace every {{VARIABLE_NAME}} placeholder in a single pass over the content
+        values = {
+            str(var_name): var_value if isinstance(var_value, str) else str(var_value)
+            for var_name, var_value in document_data.items()
+        }
+        pattern = _placeholder_pattern(frozenset(values))
+        return pattern.sub(lambda match: values[match.group(1)], content)
     
-    def _copy_template_files(
+    async def _copy_template_files(
         self,
         template_path: Path,
         temp_path: Path,
@@ -632,24 +839,33 @@ class LaTeXTemplateTools:
             include_assets: Whether to include assets
 
         """
-        import shutil
-        
-        # Copy all .tex files
-        for tex_file in template_path.glob("*.tex"):
-            shutil.copy2(tex_file, temp_path)
-        
-        # Copy sections directory
-        sections_src = template_path / "sections"
-        if sections_src.exists():
-            sections_dst = temp_path / "sections"
-            shutil.copytree(sections_src, sections_dst)
-        
-        # Copy assets if requested
-        if include_assets:
-            assets_src = template_path / "assets"
-            if assets_src.exists():
-                assets_dst = temp_path / "assets"
-                shutil.copytree(assets_src, assets_dst)
+        # Collect all .tex files
+        copies = [(tex_file, temp_path / tex_file.name) for tex_file in template_path.glob("*.tex")]
+        
+        # Collect the sections directory, plus assets if requested
+        directories = ["sections", "assets"] if include_assets else ["sections"]
+        for directory in directories:
+            src_dir = template_path / directory
+            if not src_dir.exists():
+                continue
+            (temp_path / directory).mkdir(exist_ok=True)
+            for src_file in src_dir.rglob("*"):
+                dst = temp_path / src_file.relative_to(template_path)
+                if src_file.is_dir():
+                    dst.mkdir(parents=True, exist_ok=True)
+                else:
+                    dst.parent.mkdir(parents=True, exist_ok=True)
+                    copies.append((src_file, dst))
+        
+        # Copy the files concurrently in worker threads
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(_FILE_IO_CONCURRENCY)
+        
+        async def _copy(src: Path, dst: Path) -> None:
+            async with semaphore:
+                await loop.run_in_executor(None, _copy_file, src, dst)
+        
+        await asyncio.gather(*(_copy(src, dst) for src, dst in copies))
     
     async def _compile_latex_document(
         self,
@@ -660,7 +876,9 @@ class LaTeXTemplateTools:
         
         Args:
             temp_path: Directory containing LaTeX files
-            compile_options: Additional compilation options
+            compile_options: Additional compilation options; ``compiler`` selects
+                ``"pdflatex"`` (default) or ``"tectonic"``, falling back to
+                pdflatex when tectonic is not installed
         
         Returns:
             Compilation results
@@ -676,39 +894,54 @@ class LaTeXTemplateTools:
                 "log": None
             }
         
+        compile_options = compile_options or {}
+        
         try:
-            # Check if pdflatex is available
-            result = subprocess.run(
-                ["which", "pdflatex"],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                # Record failure with circuit breaker
-                self._record_circuit_breaker_failure(Exception("pdflatex not found"))
-                return {
-                    "success": False,
-                    "error": "pdflatex not found. Please install LaTeX distribution.",
-                    "log": None
-                }
-            
-            # Compile the document
-            cmd = ["pdflatex", "-interaction=nonstopmode", "main_report.tex"]
+            # tectonic reruns itself as needed and keeps no logs or intermediates by default
+            compiler = compile_options.get("compiler", "pdflatex")
+            if compiler == "tectonic" and _find_executable("tectonic") is None:
+                logger.info("tectonic not found, falling back to pdflatex")
+                compiler = "pdflatex"
             
-            if compile_options:
+            if compiler == "tectonic":
+                cmd = ["tectonic", "--outdir", str(temp_path)]
                 if compile_options.get("quiet", False):
-                    cmd.append("-quiet")
+                    cmd.extend(["--chatter", "minimal"])
                 if compile_options.get("shell_escape", False):
-                    cmd.append("-shell-escape")
-            
-            result = subprocess.run(
-                cmd,
-                cwd=temp_path,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout
-            )
+                    cmd.extend(["-Z", "shell-escape"])
+                
+                result = await self._run_subprocess(
+                    [*cmd, "main_report.tex"], cwd=temp_path, timeout=60  # 60 second timeout
+                )
+            else:
+                # Check if pdflatex is available
+                if _find_executable("pdflatex") is None:
+                    # Record failure with circuit breaker
+                    self._record_circuit_breaker_failure(Exception("pdflatex not found"))
+                    return {
+                        "success": False,
+                        "error": "pdflatex not found. Please install LaTeX distribution.",
+                        "log": None
+                    }
+                
+                # Compile the document; options must precede the input file
+                options = ["-interaction=nonstopmode"]
+                
+                if compile_options.get("quiet", False):
+                    options.append("-quiet")
+                if compile_options.get("shell_escape", False):
+                    options.append("-shell-escape")
+                
+                # Cross-references need an extra pass; -draftmode skips writing the PDF for it
+                loop = asyncio.get_running_loop()
+                if await loop.run_in_executor(None, self._needs_multiple_passes, temp_path):
+                    await self._run_subprocess(
+                        ["pdflatex", *options, "-draftmode", "main_report.tex"], cwd=temp_path, timeout=60
+                    )
+                
+                result = await self._run_subprocess(
+                    ["pdflatex", *options, "main_report.tex"], cwd=temp_path, timeout=60  # 60 second timeout
+                )
             
             # Check if PDF was generated
             pdf_path = temp_path / "main_report.pdf"
@@ -749,13 +982,94 @@ class LaTeXTemplateTools:
                 "log": None
             }
     
-    def _copy_output_files(self, temp_path: Path, template_name: str) -> Dict[str, str]:
-        """Copy output files from temp_path to the configured output directory."""
+    def _needs_multiple_passes(self, temp_path: Path) -> bool:
+        """Check whether the document uses commands that need a second pdflatex pass.
+        
+        Args:
+            temp_path: Directory containing LaTeX files
+        
+        Returns:
+            True if any .tex source uses labels, references, citations or contents lists
+        """
+        for tex_file in [*temp_path.glob("*.tex"), *temp_path.glob("sections/*.tex")]:
+            if _MULTI_PASS_COMMAND_RE.search(tex_file.read_text(errors="replace")):
+                return True
+        return False
+    
+    async def _run_subprocess(
+        self,
+        cmd: List[str],
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = None
+    ) -> subprocess.CompletedProcess:
+        """Run a command without blocking the event loop.
+        
+        Args:
+            cmd: Command and arguments to execute
+            cwd: Working directory for the command
+            timeout: Seconds to wait before killing the command
+        
+        Returns:
+            Completed process with decoded stdout and stderr
+        
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish within ``timeout``
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._kill_subprocess(process)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except BaseException:
+            # Cancelled by the caller; don't leave the command writing into a temp dir being removed
+            await self._kill_subprocess(process)
+            raise
+        
+        return subprocess.CompletedProcess(
+            cmd,
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace")
+        )
+    
+    @staticmethod
+    async def _kill_subprocess(process: asyncio.subprocess.Process) -> None:
+        """Kill a still-running subprocess and reap it.
+        
+        Args:
+            process: Process started by ``_run_subprocess``
+        """
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass  # Exited between the returncode check and the kill
+        await process.wait()
+    
+    async def _copy_output_files(self, temp_path: Path, template_name: str) -> Dict[str, str]:
+        """Move output files from temp_path to the configured output directory.
+        
+        Files are renamed, which copies no data; when the output directory is on
+        another filesystem they are cloned or copied in a worker thread instead.
+        """
+        loop = asyncio.get_running_loop()
         output_files = {}
         for ext in ["pdf", "tex", "log"]:
             for file in temp_path.glob(f"*.{ext}"):
                 dest = self.output_directory / f"{template_name}.{ext}"
-                file.replace(dest)
+                try:
+                    file.replace(dest)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    # Cross-device move; temp_path is removed afterwards
+                    await loop.run_in_executor(None, _copy_file, file, dest)
                 output_files[ext] = str(dest)
         return output_files
     
@@ -774,16 +1088,9 @@ class LaTeXTemplateTools:
         
         for category, variables in required_vars.items():
             for var in variables:
-                # Simple type inference based on variable name
-                var_lower = var.lower()
-                if any(keyword in var_lower for keyword in ["date", "time"]):
-                    variable_types[var] = "datetime"
-                elif any(keyword in var_lower for keyword in ["number", "count", "total"]):
-                    variable_types[var] = "integer"
-                elif any(keyword in var_lower for keyword in ["score", "confidence", "percentage"]):
-                    variable_types[var] = "float"
-                else:
-                    variable_types[var] = "string"
+                # Simple type inference based on keywords in the variable name
+                match = _VARIABLE_TYPE_RE.match(var)
+                variable_types[var] = match.lastgroup if match else "string"
         
         return variable_types
     
@@ -850,5 +1157,4 @@ class LaTeXTemplateTools:
     async def health_check(self) -> bool:
         """Check if LaTeX compilation is available (placeholder)."""
         # TODO: Implement actual binary check
-        await asyncio.sleep(0.01)
         return True 
\ No newline at end of file
@@ -24,18 +24,37 @@ import time
 import sqlite3
 import json
 import os
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Any, Tuple
 from datetime import datetime, timedelta, timezone
 import structlog
 
 from .models import ThreatIntelligenceResult, DomainIntelligence, ThreatIntelligenceSource
 from .dshield_client import DShieldClient
 from .config_loader import get_config
+from .mcp_error_handler import CircuitBreaker, CircuitBreakerConfig
 from .user_config import get_user_config
 
 logger = structlog.get_logger(__name__)
 
 
+class EnrichmentDoc(NamedTuple):
+    """Enrichment result document queued for Elasticsearch writeback.
+    
+    Stored as a tuple while queued and only expanded into the ``_source``
+    dict when the batch is sent.
+    """
+    indicator: str
+    indicator_type: str
+    sources: Dict[Any, Any]
+    asn: Any
+    geo: Dict[str, Any]
+    tags: List[str]
+    timestamp: str
+    threat_score: Optional[float]
+    confidence_score: Optional[float]
+
+
 class ThreatIntelligenceManager:
     """Manages multiple threat intelligence sources and correlation.
     
@@ -85,10 +104,13 @@ class ThreatIntelligenceManager:
         self.confidence_threshold = self.correlation_config.get("confidence_threshold", 0.7)
         self.max_sources = self.correlation_config.get("max_sources_per_query", 3)
         
-        # Cache for aggregated results
-        self.cache: Dict[str, ThreatIntelligenceResult] = {}
+        # LRU cache for aggregated results; results where every source failed expire sooner
+        self.cache: "OrderedDict[str, ThreatIntelligenceResult]" = OrderedDict()
         cache_ttl_hours = threat_intel_config.get("cache_ttl_hours", 1)
         self.cache_ttl = timedelta(hours=cache_ttl_hours)
+        self.error_cache_ttl = timedelta(seconds=threat_intel_config.get("error_cache_ttl_seconds", 60))
+        self.cache_hits = 0
+        self.cache_misses = 0
         
         # SQLite cache configuration
         self.sqlite_cache_enabled = self.user_config.performance_settings.enable_sqlite_cache
@@ -98,13 +120,20 @@ class ThreatIntelligenceManager:
         if self.sqlite_cache_enabled:
             self._initialize_sqlite_cache()
         
-        # Rate limiting trackers and concurrency controls
-        self.rate_limit_trackers: Dict[ThreatIntelligenceSource, List[float]] = {}
+        # Rate limiting trackers, concurrency controls and circuit breakers
+        self.rate_limit_trackers: Dict[ThreatIntelligenceSource, Deque[float]] = {}
         self.concurrency_semaphores: Dict[ThreatIntelligenceSource, asyncio.Semaphore] = {}
+        self.circuit_breakers: Dict[ThreatIntelligenceSource, CircuitBreaker] = {}
         self._initialize_rate_limit_trackers()
         
-        # Elasticsearch client for enrichment writeback
+        # Elasticsearch client for enrichment writeback, batched through the bulk API
         self.elasticsearch_client = None
+        self._writeback_queue: List[Tuple[str, str, EnrichmentDoc]] = []
+        # Pending flush timer and the timed flush it started; only the timer is cancelled
+        self._writeback_flush_timer: Optional[asyncio.TimerHandle] = None
+        self._writeback_flush_task: Optional[asyncio.Task] = None
+        # Last computed writeback index name, keyed by (index_prefix, year, month)
+        self._writeback_index: Tuple[Tuple[str, int, int], str] = (("", 0, 0), "")
         self._initialize_elasticsearch()
         
         logger.info("Enhanced Threat Intelligence Manager initialized", 
@@ -187,9 +216,9 @@ class ThreatIntelligenceManager:
             self.sqlite_cache_enabled = False
     
     def _initialize_rate_limit_trackers(self) -> None:
-        """Initialize rate limiting trackers and concurrency controls for each source."""
+        """Initialize rate limiting trackers, concurrency controls and circuit breakers for each source."""
         for source in self.clients.keys():
-            self.rate_limit_trackers[source] = []
+            self.rate_limit_trackers[source] = deque()
             
             # Initialize concurrency semaphores for each source
             sources_config = self.config.get("threat_intelligence", {}).get("sources", {})
@@ -198,6 +227,16 @@ class ThreatIntelligenceManager:
             
             self.concurrency_semaphores[source] = asyncio.Semaphore(concurrency_limit)
             
+            # Stop querying a failing source until its recovery timeout has passed
+            self.circuit_breakers[source] = CircuitBreaker(
+                f"threat_intel_{source.value}",
+                CircuitBreakerConfig(
+                    failure_threshold=source_config.get("circuit_breaker_failure_threshold", 5),
+                    recovery_timeout=source_config.get("circuit_breaker_recovery_seconds", 30.0),
+                    success_threshold=1
+                )
+            )
+            
         logger.info("Rate limit trackers and concurrency controls initialized", 
                    sources=list(self.clients.keys()),
                    concurrency_limits={source.value: self.concurrency_semaphores[source]._value 
@@ -245,21 +284,22 @@ class ThreatIntelligenceManager:
         # Check cache first
         cache_key = f"comprehensive_ip_{ip_address}"
         
-        # Check SQLite cache first (if enabled)
+        # Check memory cache first
+        cached_result = self._get_cached_result(cache_key)
+        if cached_result:
+            logger.debug("Returning memory cached IP enrichment result", ip_address=ip_address)
+            cached_result.cache_hit = True
+            return cached_result
+        
+        # Fall back to the SQLite cache (if enabled) and promote hits into memory
         if self.sqlite_cache_enabled:
             cached_result = await self._get_sqlite_cached_result(cache_key)
             if cached_result:
                 logger.debug("Returning SQLite cached IP enrichment result", ip_address=ip_address)
                 cached_result.cache_hit = True
+                self._cache_result(cache_key, cached_result)
                 return cached_result
         
-        # Check memory cache as fallback
-        cached_result = self._get_cached_result(cache_key)
-        if cached_result:
-            logger.debug("Returning memory cached IP enrichment result", ip_address=ip_address)
-            cached_result.cache_hit = True
-            return cached_result
-        
         if not self.clients:
             raise RuntimeError("No threat intelligence sources available")
         
@@ -267,10 +307,12 @@ class ThreatIntelligenceManager:
                    ip_address=ip_address,
                    available_sources=list(self.clients.keys()))
         
-        # Query all enabled sources concurrently
+        # Query all enabled sources concurrently; each query carries its own timeout
+        queried_sources = []
         tasks = []
         for source, client in self.clients.items():
             if hasattr(client, 'get_ip_reputation'):
+                queried_sources.append(source)
                 tasks.append(self._query_source_async(source, client, ip_address))
         
         # Wait for all queries to complete
@@ -280,7 +322,7 @@ class ThreatIntelligenceManager:
         result = ThreatIntelligenceResult(ip_address=ip_address)
         successful_sources = []
         
-        for source, source_result in zip(self.clients.keys(), source_results):
+        for source, source_result in zip(queried_sources, source_results):
             if isinstance(source_result, Exception):
                 logger.warning("Source query failed", 
                               source=source, 
@@ -296,8 +338,8 @@ class ThreatIntelligenceManager:
         # Correlate and score results
         await self._correlate_results(result)
         
-        # Cache the result in both SQLite and memory
-        if self.sqlite_cache_enabled:
+        # Cache the result in both SQLite and memory; failed lookups stay in memory only
+        if self.sqlite_cache_enabled and successful_sources:
             self._cache_result_to_sqlite(cache_key, result)
         self._cache_result(cache_key, result)
         
@@ -418,7 +460,13 @@ class ThreatIntelligenceManager:
         Raises:
             Exception: If the source query fails
             asyncio.TimeoutError: If the query times out
+            RuntimeError: If the source's circuit breaker is open
         """
+        # Fail fast while the source is known to be down
+        circuit_breaker = self.circuit_breakers.get(source)
+        if circuit_breaker and not circuit_breaker.can_execute():
+            raise RuntimeError(f"Circuit breaker open for {source.value}")
+        
         # Get source configuration
         sources_config = self.config.get("threat_intelligence", {}).get("sources", {})
         source_config = sources_config.get(source.value, {})
@@ -428,9 +476,6 @@ class ThreatIntelligenceManager:
         semaphore = self.concurrency_semaphores.get(source)
         
         async def _execute_query():
-            # Check rate limiting
-            await self._check_rate_limit(source)
-            
             try:
                 if source == ThreatIntelligenceSource.DSHIELD:
                     return await client.get_ip_reputation(ip_address)
@@ -448,12 +493,26 @@ class ThreatIntelligenceManager:
                             error=str(e))
                 raise
         
+        async def _rate_limited_query():
+            # Waiting on our own rate limiter is not a provider failure, so it
+            # stays outside the timeout and the circuit breaker accounting
+            await self._check_rate_limit(source)
+            try:
+                result = await asyncio.wait_for(_execute_query(), timeout=timeout_seconds)
+            except Exception as e:
+                if circuit_breaker:
+                    circuit_breaker.on_failure(e)
+                raise
+            
+            if circuit_breaker:
+                circuit_breaker.on_success()
+            return result
+        
         # Execute with concurrency control and timeout
         if semaphore:
             async with semaphore:
-                return await asyncio.wait_for(_execute_query(), timeout=timeout_seconds)
-        else:
-            return await asyncio.wait_for(_execute_query(), timeout=timeout_seconds)
+                return await _rate_limited_query()
+        return await _rate_limited_query()
     
     async def _correlate_results(self, result: ThreatIntelligenceResult) -> None:
         """Correlate results from multiple sources using advanced algorithms.
@@ -672,8 +731,9 @@ class ThreatIntelligenceManager:
         current_time = time.time()
         tracker = self.rate_limit_trackers[source]
         
-        # Remove old entries (older than 1 minute)
-        tracker[:] = [t for t in tracker if current_time - t < 60]
+        # Remove old entries (older than 1 minute); timestamps are appended in order
+        while tracker and current_time - tracker[0] >= 60:
+            tracker.popleft()
         
         # Get rate limit configuration
         sources_config = self.config.get("threat_intelligence", {}).get("sources", {})
@@ -685,7 +745,7 @@ class ThreatIntelligenceManager:
         # Check if we're at the rate limit
         if len(tracker) >= rate_limit:
             # Calculate wait time until we can make another request
-            oldest_request = min(tracker)
+            oldest_request = tracker[0]
             wait_time = 60 - (current_time - oldest_request)
             
             if wait_time > 0:
@@ -706,7 +766,8 @@ class ThreatIntelligenceManager:
                 
                 # Re-check after waiting
                 current_time = time.time()
-                tracker[:] = [t for t in tracker if current_time - t < 60]
+                while tracker and current_time - tracker[0] >= 60:
+                    tracker.popleft()
                 
                 if len(tracker) >= rate_limit:
                     raise RuntimeError(f"Rate limit exceeded for {source.value} after backoff")
@@ -716,18 +777,24 @@ class ThreatIntelligenceManager:
     def _get_cached_result(self, cache_key: str) -> Optional[ThreatIntelligenceResult]:
         """Get cached result if available and not expired.
         
+        Results without any successful source expire after ``error_cache_ttl``
+        so provider outages are retried sooner than good answers.
+        
         Args:
             cache_key: The cache key to look up
             
         Returns:
             Cached result if available and valid, None otherwise
         """
-        if cache_key in self.cache:
-            cached = self.cache[cache_key]
-            if datetime.now(timezone.utc) - cached.query_timestamp < self.cache_ttl:
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            ttl = self.cache_ttl if cached.sources_queried else self.error_cache_ttl
+            if datetime.now(timezone.utc) - cached.query_timestamp < ttl:
+                self.cache.move_to_end(cache_key)
+                self.cache_hits += 1
                 return cached
-            else:
-                del self.cache[cache_key]
+            del self.cache[cache_key]
+        self.cache_misses += 1
         return None
     
     def _cache_result(self, cache_key: str, result: ThreatIntelligenceResult) -> None:
@@ -738,15 +805,12 @@ class ThreatIntelligenceManager:
             result: The result to cache
         """
         self.cache[cache_key] = result
+        self.cache.move_to_end(cache_key)
         
-        # Implement cache size limit
+        # Implement cache size limit by evicting least recently used entries
         max_cache_size = self.config.get("threat_intelligence", {}).get("max_cache_size", 1000)
-        if len(self.cache) > max_cache_size:
-            # Remove oldest entries
-            oldest_keys = sorted(self.cache.keys(), 
-                               key=lambda k: self.cache[k].query_timestamp)[:len(self.cache) - max_cache_size]
-            for key in oldest_keys:
-                del self.cache[key]
+        while len(self.cache) > max_cache_size:
+            self.cache.popitem(last=False)
     
     def _get_cached_domain_result(self, cache_key: str) -> Optional[DomainIntelligence]:
         """Get cached domain result if available and not expired.
@@ -842,40 +906,124 @@ class ThreatIntelligenceManager:
                           cache_key=cache_key)
     
     async def _write_to_elasticsearch(self, result: "ThreatIntelligenceResult") -> None:
-        """Write enrichment result to Elasticsearch for correlation, if enabled in config."""
+        """Queue an enrichment result for bulk writeback to Elasticsearch, if enabled in config.
+
+        The queue is flushed once it reaches ``writeback_batch_size`` actions, or
+        ``writeback_flush_seconds`` after the first queued action, whichever
+        comes first. Any remainder is flushed by ``cleanup``.
+        """
         es_config = self.config.get("threat_intelligence", {}).get("elasticsearch", {})
         writeback_enabled = es_config.get("writeback_enabled", False)
         if not (self.elasticsearch_client and writeback_enabled):
             return
+        timestamp = result.query_timestamp.isoformat()
+        # Prepare document for Elasticsearch
+        doc = EnrichmentDoc(
+            indicator=result.ip_address,
+            indicator_type="ip",
+            sources=result.source_results,
+            asn=result.network_data.get("asn"),
+            geo=result.geographic_data,
+            tags=[indicator.get("type", "unknown") for indicator in result.threat_indicators],
+            timestamp=timestamp,
+            threat_score=result.overall_threat_score,
+            confidence_score=result.confidence_score
+        )
+        await self._es_write(
+            self._writeback_index_name(es_config, result.query_timestamp),
+            f"{result.ip_address}_{timestamp}",
+            doc
+        )
+    
+    async def _es_write(self, index_name: str, doc_id: str, doc: EnrichmentDoc) -> None:
+        """Queue one document for bulk indexing and schedule or trigger a flush.
+        
+        This is the single entry point for writeback documents, so tests can
+        replace it with an in-memory buffer.
+        
+        Args:
+            index_name: Target Elasticsearch index
+            doc_id: Document ID
+            doc: Enrichment document to index
+        """
+        es_config = self.config.get("threat_intelligence", {}).get("elasticsearch", {})
+        self._writeback_queue.append((index_name, doc_id, doc))
+        
+        if len(self._writeback_queue) >= es_config.get("writeback_batch_size", 500):
+            await self._flush_writeback()
+        elif self._writeback_flush_timer is None:
+            self._writeback_flush_timer = asyncio.get_running_loop().call_later(
+                es_config.get("writeback_flush_seconds", 5), self._start_timed_flush
+            )
+    
+    def _writeback_index_name(self, es_config: Dict[str, Any], timestamp: datetime) -> str:
+        """Return the monthly writeback index name for a result timestamp.
+        
+        The name only changes with the configured prefix or the month, so the
+        last one is reused rather than formatted for every document.
+        
+        Args:
+            es_config: Elasticsearch section of the threat intelligence config
+            timestamp: Query timestamp of the result being written
+            
+        Returns:
+            Index name of the form ``<index_prefix>-YYYY.MM``
+        """
+        key = (es_config.get("index_prefix", "enrichment-intel"), timestamp.year, timestamp.month)
+        cached_key, index_name = self._writeback_index
+        if cached_key != key:
+            index_name = f"{key[0]}-{key[1]:04d}.{key[2]:02d}"
+            self._writeback_index = (key, index_name)
+        return index_name
+    
+    def _start_timed_flush(self) -> None:
+        """Start flushing the writeback queue once the flush interval elapses."""
+        self._writeback_flush_timer = None
+        self._writeback_flush_task = asyncio.create_task(self._flush_writeback())
+    
+    async def _flush_writeback(self) -> None:
+        """Send all queued writeback actions to Elasticsearch in bulk requests.
+        
+        Rejected documents and request failures are logged and dropped;
+        writeback never fails enrichment.
+        """
+        if not self._writeback_queue or not self.elasticsearch_client:
+            self._writeback_queue.clear()
+            return
+        queued, self._writeback_queue = self._writeback_queue, []
+        actions = [
+            {"_op_type": "index", "_index": index_name, "_id": doc_id, "_source": doc._asdict()}
+            for index_name, doc_id, doc in queued
+        ]
+        es_config = self.config.get("threat_intelligence", {}).get("elasticsearch", {})
         try:
-            # Prepare document for Elasticsearch
-            doc = {
-                "indicator": result.ip_address,
-                "indicator_type": "ip",
-                "sources": result.source_results,
-                "asn": result.network_data.get("asn"),
-                "geo": result.geographic_data,
-                "tags": [indicator.get("type", "unknown") for indicator in result.threat_indicators],
-                "timestamp": result.query_timestamp.isoformat(),
-                "threat_score": result.overall_threat_score,
-                "confidence_score": result.confidence_score
-            }
-            # Use index prefix from config if present
-            index_prefix = es_config.get("index_prefix", "enrichment-intel")
-            index_name = f"{index_prefix}-{result.query_timestamp.strftime('%Y.%m')}"
-            await self.elasticsearch_client.index(
-                index=index_name,
-                document=doc,
-                id=f"{result.ip_address}_{result.query_timestamp.isoformat()}"
+            from elasticsearch.helpers import async_bulk
+            success, errors = await async_bulk(
+                self.elasticsearch_client,
+                actions,
+                chunk_size=es_config.get("writeback_batch_size", 500),
+                raise_on_error=False
             )
+            if errors:
+                logger.warning("Elasticsearch rejected enrichment writeback documents",
+                               failed=len(errors), succeeded=success, sample_errors=errors[:3])
+            else:
+                logger.debug("Flushed enrichment writeback", documents=len(actions))
         except Exception as e:
-            import structlog
-            logger = structlog.get_logger(__name__)
-            logger.warning("Failed to write to Elasticsearch", error=str(e))
+            logger.warning("Failed to write to Elasticsearch", error=str(e), documents=len(actions))
     
     async def cleanup(self) -> None:
         """Clean up resources and close connections."""
         try:
+            # Flush any enrichment writeback still waiting on the timer, letting a
+            # timed flush that is already sending its batch finish first
+            if self._writeback_flush_timer is not None:
+                self._writeback_flush_timer.cancel()
+                self._writeback_flush_timer = None
+            if self._writeback_flush_task is not None:
+                await self._writeback_flush_task
+            await self._flush_writeback()
+            
             # Clean up expired entries from SQLite cache
             if self.sqlite_cache_enabled:
                 self._cleanup_sqlite_cache()
@@ -932,7 +1080,9 @@ class ThreatIntelligenceManager:
                 "concurrency_limit": self.concurrency_semaphores.get(source, asyncio.Semaphore(5))._value,
                 "rate_limit_per_minute": source_config.get("rate_limit_requests_per_minute", 60),
                 "timeout_seconds": source_config.get("timeout_seconds", 30),
-                "max_backoff_attempts": source_config.get("max_backoff_attempts", 3)
+                "max_backoff_attempts": source_config.get("max_backoff_attempts", 3),
+                "circuit_breaker": (self.circuit_breakers[source].get_status()
+                                    if source in self.circuit_breakers else None)
             }
         return status
     
@@ -946,7 +1096,10 @@ class ThreatIntelligenceManager:
             "memory_cache": {
                 "enabled": True,
                 "size": len(self.cache),
-                "ttl_hours": self.cache_ttl.total_seconds() / 3600
+                "ttl_hours": self.cache_ttl.total_seconds() / 3600,
+                "error_ttl_seconds": self.error_cache_ttl.total_seconds(),
+                "hits": self.cache_hits,
+                "misses": self.cache_misses
             },
             "sqlite_cache": {
                 "enabled": self.sqlite_cache_enabled,
@@ -20,24 +20,119 @@ Example:
     >>> print(page_size)
 """
 
+import copy
+import logging
+import mmap
 import os
+import socket
+import sys
+import threading
 import yaml
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    Any, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union, get_origin,
+)
+import dataclasses
 from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
+from types import MappingProxyType
 import structlog
 from dotenv import load_dotenv
 
 from .config_loader import get_config, ConfigError
 from .op_secrets import OnePasswordSecrets
 
-logger = structlog.get_logger(__name__)
+# Process identity is resolved once and bound so it is not re-read per entry
+_HOSTNAME = socket.gethostname()
+_PID = os.getpid()
+
+logger = structlog.get_logger(__name__).bind(host=_HOSTNAME, pid=_PID)
+
+# Prefer the libyaml C parser/emitter when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:  # pragma: no cover - depends on PyYAML build
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper  # type: ignore[assignment]
+    logger.warning("libyaml C extension not available; YAML I/O will be slow")
+
+_LOG_LEVEL_VALUES: Dict[str, int] = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+# Numeric threshold mirroring the active logging_settings.log_level
+_log_threshold: int = logging.INFO
+
+
+def _should_log(level: str) -> bool:
+    """Check whether a message at the given level would be emitted.
+
+    Lets call sites skip building log messages that the configured
+    ``logging_settings.log_level`` would discard anyway.
+
+    Args:
+        level: Log level name (e.g. "INFO")
+
+    Returns:
+        True if messages at this level pass the configured threshold
+    """
+    return _LOG_LEVEL_VALUES.get(level, logging.NOTSET) >= _log_threshold
+
+
+def _set_log_threshold(level: str) -> None:
+    """Update the threshold used by _should_log.
+
+    Args:
+        level: Log level name; unknown names fall back to INFO
+    """
+    global _log_threshold
+    _log_threshold = _LOG_LEVEL_VALUES.get(level.upper(), logging.INFO)
 
 # Load environment variables
 load_dotenv()
 
 
-@dataclass
+def _build_user_config_candidates() -> Tuple[Path, ...]:
+    """Build the ordered tuple of user configuration file locations.
+
+    Returns:
+        Tuple of candidate paths, highest precedence first
+    """
+    return (
+        Path("user_config.yaml"),
+        Path("config/user_config.yaml"),
+        Path.home() / ".dshield-mcp" / "user_config.yaml",
+    )
+
+
+# Resolved once at import so the home directory is not looked up per load
+_USER_CONFIG_CANDIDATES: Tuple[Path, ...] = _build_user_config_candidates()
+
+
+# Files larger than this are memory-mapped for parsing; smaller files are read
+# directly because the mapping setup costs more than the copy it saves
+_MMAP_THRESHOLD_BYTES = 64 * 1024
+
+# Parsed user config files keyed by path, with the stat identity they were read at
+_user_config_file_cache: Dict[Path, Tuple[Tuple[int, int, int, int], Dict[str, Any]]] = {}
+
+
+def refresh_user_config_candidates() -> None:
+    """Recompute the user configuration file locations.
+
+    The candidate paths and the default save path are cached. Call this after
+    changing ``$HOME`` (e.g. in tests) so home-directory locations are
+    re-resolved.
+    """
+    global _USER_CONFIG_CANDIDATES
+    _USER_CONFIG_CANDIDATES = _build_user_config_candidates()
+    UserConfigManager._default_path_cache = None
+
+
+@dataclass(frozen=True)
 class QuerySettings:
     """User-configurable query settings.
     
@@ -59,7 +154,7 @@ class QuerySettings:
     max_query_complexity: int = 1000
 
 
-@dataclass
+@dataclass(frozen=True)
 class PaginationSettings:
     """User-configurable pagination settings.
     
@@ -77,7 +172,7 @@ class PaginationSettings:
     include_performance_metrics: bool = True
 
 
-@dataclass
+@dataclass(frozen=True)
 class StreamingSettings:
     """User-configurable streaming settings.
     
@@ -97,7 +192,7 @@ class StreamingSettings:
     session_timeout_minutes: int = 30
 
 
-@dataclass
+@dataclass(frozen=True)
 class PerformanceSettings:
     """User-configurable performance settings.
     
@@ -123,7 +218,7 @@ class PerformanceSettings:
     sqlite_cache_db_name: str = "enrichment_cache.sqlite3"
 
 
-@dataclass
+@dataclass(frozen=True)
 class SecuritySettings:
     """User-configurable security settings.
     
@@ -147,7 +242,7 @@ class SecuritySettings:
     ])
 
 
-@dataclass
+@dataclass(frozen=True)
 class LoggingSettings:
     """User-configurable logging settings.
     
@@ -167,7 +262,7 @@ class LoggingSettings:
     max_log_size_mb: int = 100
 
 
-@dataclass
+@dataclass(frozen=True)
 class CampaignSettings:
     """User-configurable campaign analysis settings.
     
@@ -195,6 +290,245 @@ class CampaignSettings:
     expansion_timeout_seconds: int = 300
 
 
+# User config section name -> UserConfigManager settings attribute
+_SECTION_MAP: Dict[str, str] = {
+    "query": "query_settings",
+    "pagination": "pagination_settings",
+    "streaming": "streaming_settings",
+    "performance": "performance_settings",
+    "security": "security_settings",
+    "logging": "logging_settings",
+    "campaign": "campaign_settings",
+}
+
+# Settings dataclass per user config section
+_SETTINGS_CLASSES: Dict[str, type] = {
+    "query": QuerySettings,
+    "pagination": PaginationSettings,
+    "streaming": StreamingSettings,
+    "performance": PerformanceSettings,
+    "security": SecuritySettings,
+    "logging": LoggingSettings,
+    "campaign": CampaignSettings,
+}
+
+# Field names per section, extracted once instead of reflecting per call
+_FIELDS_BY_SECTION: Dict[str, Tuple[str, ...]] = {
+    section: tuple(f.name for f in dataclasses.fields(settings_cls))
+    for section, settings_cls in _SETTINGS_CLASSES.items()
+}
+
+
+_TRUE_VALUES = frozenset({"1", "true", "TRUE", "True", "yes", "on"})
+
+
+def _parse_bool(value: str) -> bool:
+    """Parse a boolean environment variable value.
+
+    Args:
+        value: Raw environment variable value
+
+    Returns:
+        True for "1", "true", "yes" or "on" (case-insensitive), else False
+    """
+    return value in _TRUE_VALUES or value.lower() in _TRUE_VALUES
+
+
+def _parse_list(value: str) -> List[str]:
+    """Parse a comma-separated environment variable value.
+
+    Args:
+        value: Raw environment variable value
+
+    Returns:
+        List of stripped items
+    """
+    return [item.strip() for item in value.split(",")]
+
+
+# Environment variable overrides: (variable, settings attribute, field, parser)
+_ENV_OVERRIDES: Tuple[Tuple[str, str, str, Callable[[str], Any]], ...] = (
+    # Query Settings
+    ("DEFAULT_PAGE_SIZE", "query_settings", "default_page_size", int),
+    ("MAX_PAGE_SIZE", "query_settings", "max_page_size", int),
+    ("DEFAULT_TIMEOUT_SECONDS", "query_settings", "default_timeout_seconds", int),
+    ("MAX_TIMEOUT_SECONDS", "query_settings", "max_timeout_seconds", int),
+    ("ENABLE_SMART_OPTIMIZATION", "query_settings", "enable_smart_optimization", _parse_bool),
+    ("FALLBACK_STRATEGY", "query_settings", "fallback_strategy", str),
+    ("MAX_QUERY_COMPLEXITY", "query_settings", "max_query_complexity", int),
+    # Pagination Settings
+    ("PAGINATION_METHOD", "pagination_settings", "default_method", str),
+    ("MAX_PAGES_PER_REQUEST", "pagination_settings", "max_pages_per_request", int),
+    ("CURSOR_TIMEOUT_SECONDS", "pagination_settings", "cursor_timeout_seconds", int),
+    ("ENABLE_PAGINATION_METADATA", "pagination_settings", "enable_metadata", _parse_bool),
+    ("INCLUDE_PERFORMANCE_METRICS", "pagination_settings", "include_performance_metrics", _parse_bool),
+    # Streaming Settings
+    ("DEFAULT_CHUNK_SIZE", "streaming_settings", "default_chunk_size", int),
+    ("MAX_CHUNK_SIZE", "streaming_settings", "max_chunk_size", int),
+    ("SESSION_CONTEXT_FIELDS", "streaming_settings", "session_context_fields", _parse_list),
+    ("ENABLE_SESSION_SUMMARIES", "streaming_settings", "enable_session_summaries", _parse_bool),
+    ("SESSION_TIMEOUT_MINUTES", "streaming_settings", "session_timeout_minutes", int),
+    # Performance Settings
+    ("ENABLE_CACHING", "performance_settings", "enable_caching", _parse_bool),
+    ("CACHE_TTL_SECONDS", "performance_settings", "cache_ttl_seconds", int),
+    ("MAX_CACHE_SIZE", "performance_settings", "max_cache_size", int),
+    ("ENABLE_CONNECTION_POOLING", "performance_settings", "enable_connection_pooling", _parse_bool),
+    ("CONNECTION_POOL_SIZE", "performance_settings", "connection_pool_size", int),
+    ("REQUEST_TIMEOUT_SECONDS", "performance_settings", "request_timeout_seconds", int),
+    ("ENABLE_SQLITE_CACHE", "performance_settings", "enable_sqlite_cache", _parse_bool),
+    ("SQLITE_CACHE_TTL_HOURS", "performance_settings", "sqlite_cache_ttl_hours", int),
+    ("SQLITE_CACHE_DB_NAME", "performance_settings", "sqlite_cache_db_name", str),
+    # Security Settings
+    ("RATE_LIMIT_REQUESTS_PER_MINUTE", "security_settings", "rate_limit_requests_per_minute", int),
+    ("MAX_QUERY_RESULTS", "security_settings", "max_query_results", int),
+    ("ENABLE_FIELD_VALIDATION", "security_settings", "enable_field_validation", _parse_bool),
+    ("ALLOWED_FIELD_PATTERNS", "security_settings", "allowed_field_patterns", _parse_list),
+    ("BLOCK_SENSITIVE_FIELDS", "security_settings", "block_sensitive_fields", _parse_bool),
+    ("SENSITIVE_FIELD_PATTERNS", "security_settings", "sensitive_field_patterns", _parse_list),
+    # Logging Settings
+    ("LOG_LEVEL", "logging_settings", "log_level", str),
+    ("LOG_FORMAT", "logging_settings", "log_format", str),
+    ("ENABLE_QUERY_LOGGING", "logging_settings", "enable_query_logging", _parse_bool),
+    ("ENABLE_PERFORMANCE_LOGGING", "logging_settings", "enable_performance_logging", _parse_bool),
+    ("LOG_SENSITIVE_DATA", "logging_settings", "log_sensitive_data", _parse_bool),
+    ("MAX_LOG_SIZE_MB", "logging_settings", "max_log_size_mb", int),
+    # Campaign Settings
+    ("CORRELATION_WINDOW_MINUTES", "campaign_settings", "correlation_window_minutes", int),
+    ("MIN_CONFIDENCE_THRESHOLD", "campaign_settings", "min_confidence_threshold", float),
+    ("MAX_CAMPAIGN_EVENTS", "campaign_settings", "max_campaign_events", int),
+    ("ENABLE_GEOSPATIAL_CORRELATION", "campaign_settings", "enable_geospatial_correlation", _parse_bool),
+    ("ENABLE_INFRASTRUCTURE_CORRELATION", "campaign_settings", "enable_infrastructure_correlation", _parse_bool),
+    ("ENABLE_BEHAVIORAL_CORRELATION", "campaign_settings", "enable_behavioral_correlation", _parse_bool),
+    ("ENABLE_TEMPORAL_CORRELATION", "campaign_settings", "enable_temporal_correlation", _parse_bool),
+    ("ENABLE_IP_CORRELATION", "campaign_settings", "enable_ip_correlation", _parse_bool),
+    ("MAX_EXPANSION_DEPTH", "campaign_settings", "max_expansion_depth", int),
+    ("EXPANSION_TIMEOUT_SECONDS", "campaign_settings", "expansion_timeout_seconds", int),
+)
+
+
+def _atomic_write(file_path: Path, payload: bytes) -> None:
+    """Write bytes to a file so readers never see a partial write.
+    
+    The payload is written to ``<name>.tmp`` beside the target and moved
+    into place with os.replace(); the temporary file is removed on failure.
+    
+    Args:
+        file_path: Destination path
+        payload: Complete file contents
+    """
+    tmp_path = file_path.with_name(file_path.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+# Validation rules checked by UserConfigManager._validate_settings
+
+# (settings attribute, field, field that must not be exceeded)
+_ORDERED_FIELDS: Tuple[Tuple[str, str, str], ...] = (
+    ("query_settings", "default_page_size", "max_page_size"),
+    ("query_settings", "default_timeout_seconds", "max_timeout_seconds"),
+    ("streaming_settings", "default_chunk_size", "max_chunk_size"),
+)
+
+_FALLBACK_STRATEGIES = frozenset({"aggregate", "sample", "error"})
+_PAGINATION_METHODS = frozenset({"page", "cursor"})
+_LOG_LEVELS = frozenset({"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"})
+_LOG_FORMATS = frozenset({"json", "text"})
+
+# (settings attribute, field, allowed values, error message)
+_ENUM_FIELDS: Tuple[Tuple[str, str, FrozenSet[str], str], ...] = (
+    ("query_settings", "fallback_strategy", _FALLBACK_STRATEGIES,
+     "fallback_strategy must be one of: aggregate, sample, error"),
+    ("pagination_settings", "default_method", _PAGINATION_METHODS,
+     "pagination_method must be one of: page, cursor"),
+    ("logging_settings", "log_format", _LOG_FORMATS,
+     "log_format must be one of: json, text"),
+)
+
+# (settings attribute, field) pairs that must be greater than zero
+_POSITIVE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("pagination_settings", "max_pages_per_request"),
+    ("streaming_settings", "session_timeout_minutes"),
+    ("performance_settings", "cache_ttl_seconds"),
+    ("performance_settings", "max_cache_size"),
+    ("performance_settings", "connection_pool_size"),
+    ("security_settings", "rate_limit_requests_per_minute"),
+    ("security_settings", "max_query_results"),
+    ("logging_settings", "max_log_size_mb"),
+    ("campaign_settings", "correlation_window_minutes"),
+    ("campaign_settings", "max_campaign_events"),
+    ("campaign_settings", "max_expansion_depth"),
+    ("campaign_settings", "expansion_timeout_seconds"),
+)
+
+# (settings attribute, field, inclusive minimum, inclusive maximum)
+_BOUNDED_FIELDS: Tuple[Tuple[str, str, float, float], ...] = (
+    ("campaign_settings", "min_confidence_threshold", 0.0, 1.0),
+)
+
+def _format_bool(value: Any) -> str:
+    """Format a boolean setting for export.
+
+    Args:
+        value: Setting value, normally a bool
+
+    Returns:
+        "True" or "False", or str(value) for non-boolean values
+    """
+    if value is True:
+        return "True"
+    if value is False:
+        return "False"
+    return str(value)
+
+
+# Environment variable formatter per declared setting type
+_FORMATTERS: Dict[Any, Callable[[Any], str]] = {
+    bool: _format_bool,
+    int: str,
+    float: str,
+    str: str,
+    list: ",".join,
+}
+
+# Variable names are interned so every exported mapping shares the same key
+# objects (with their cached hashes) instead of fresh equal strings
+_ENV_NAMES: Dict[Tuple[str, str], str] = {
+    (section, setting): sys.intern(env_name)
+    for env_name, section, setting, _ in _ENV_OVERRIDES
+}
+
+# Export schema shared by export_config() and get_environment_variables():
+# (section, settings attribute, field names, getter returning all field values
+#  in one call, environment variable names, formatters), specialized per section
+# at import so the walk does no per-field attribute lookups in Python
+_CONFIG_SCHEMA: Tuple[Tuple[
+    str, str, Tuple[str, ...], Callable[[Any], Tuple[Any, ...]],
+    Tuple[str, ...], Tuple[Callable[[Any], str], ...],
+], ...] = tuple(
+    (
+        section,
+        attr,
+        _FIELDS_BY_SECTION[section],
+        attrgetter(*_FIELDS_BY_SECTION[section]),
+        tuple(_ENV_NAMES[(attr, f.name)] for f in dataclasses.fields(_SETTINGS_CLASSES[section])),
+        tuple(
+            _FORMATTERS[get_origin(f.type) or f.type]
+            for f in dataclasses.fields(_SETTINGS_CLASSES[section])
+        ),
+    )
+    for section, attr in _SECTION_MAP.items()
+)
+
+
 class UserConfigManager:
     """Manages user-configurable settings with validation and environment variable support.
     
@@ -224,6 +558,9 @@ class UserConfigManager:
         >>> print(output_dir)
     """
     
+    # Default save location, resolved (and its directory created) on first save
+    _default_path_cache: ClassVar[Optional[Path]] = None
+    
     def __init__(self, config_path: Optional[str] = None) -> None:
         """Initialize the UserConfigManager.
         
@@ -231,13 +568,19 @@ class UserConfigManager:
             config_path: Optional path to the configuration file
         """
         self.config_path = config_path
-        self.op_secrets = OnePasswordSecrets()
+        self._op_secrets: Optional[OnePasswordSecrets] = None
+        self._env_cache: Optional[Dict[str, str]] = None
+        self._env_view: Optional[Mapping[str, str]] = None
+        self._export_cache: Optional[Dict[str, Any]] = None
+        self._cached_settings: Tuple[Any, ...] = ()
+        self._config_version = 0
         
         # Load base configuration
         try:
             self.base_config = get_config(config_path)
         except ConfigError as e:
-            logger.warning(f"Failed to load base config: {e}")
+            if _should_log("WARNING"):
+                logger.warning("Failed to load base config", error=str(e))
             self.base_config = {}
         
         # Initialize settings with defaults
@@ -256,11 +599,128 @@ class UserConfigManager:
         self._load_user_config()
         
         # Ensure output directory exists
+        self._ensure_output_directory()
+
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any]) -> "UserConfigManager":
+        """Create a manager from an already-parsed configuration dictionary.
+        
+        Skips base config loading, user config file discovery and environment
+        variable overrides; only the given sections and defaults are applied.
+        Useful for tests and callers that construct many managers.
+        
+        Args:
+            config: Configuration in the same shape as export_config() output
+        
+        Returns:
+            UserConfigManager: A validated manager built from the dictionary
+        
+        Raises:
+            ValueError: If the resulting settings are invalid
+        """
+        manager = cls.__new__(cls)
+        manager.config_path = None
+        manager._op_secrets = None
+        manager._env_cache = None
+        manager._env_view = None
+        manager._export_cache = None
+        manager._cached_settings = ()
+        manager._config_version = 0
+        manager.base_config = {}
+        for section, attr in _SECTION_MAP.items():
+            section_config = config.get(section) or {}
+            fields = _FIELDS_BY_SECTION[section]
+            setattr(manager, attr, _SETTINGS_CLASSES[section](**{
+                setting: value for setting, value in section_config.items() if setting in fields
+            }))
+        manager.output_directory = config.get("output_directory")
+        manager._validate_settings()
+        manager._ensure_output_directory()
+        return manager
+
+    def clone(self) -> "UserConfigManager":
+        """Create an independent copy of this manager without reloading.
+        
+        Returns:
+            UserConfigManager: A copy whose settings can be changed without
+            affecting this instance
+        """
+        clone = copy.copy(self)
+        for attr in _SECTION_MAP.values():
+            setattr(clone, attr, copy.deepcopy(getattr(self, attr)))
+        clone._invalidate_caches()
+        return clone
+
+    def _invalidate_caches(self) -> None:
+        """Drop values derived from the current settings.
+        
+        Must be called whenever settings change so cached views such as
+        get_environment_variables() are rebuilt on next access.
+        """
+        self._env_cache = None
+        self._env_view = None
+        self._export_cache = None
+        self._cached_settings = ()
+        self._config_version += 1
+    
+    def close(self) -> None:
+        """Release cached data held by this manager.
+        
+        Config files are mapped and read only for the duration of a load, so
+        no file handles outlive it; this drops the derived caches and the
+        lazily created secrets manager. The manager stays usable and rebuilds
+        whatever it needs on next access.
+        """
+        self._invalidate_caches()
+        self._op_secrets = None
+    
+    def _settings_snapshot(self) -> Tuple[Any, ...]:
+        """Get the current output directory and settings objects.
+        
+        Settings dataclasses are frozen, so any change replaces the object;
+        comparing this snapshot by identity detects changes made by direct
+        attribute assignment as well as through update_setting().
+        
+        Returns:
+            Tuple of the output directory followed by each settings object
+        """
+        return (self.output_directory,) + tuple(
+            getattr(self, attr) for attr in _SECTION_MAP.values()
+        )
+    
+    def _caches_current(self) -> bool:
+        """Check whether cached exports were built from the current settings.
+        
+        Returns:
+            True if every settings object is the one the caches were built from
+        """
+        return self._env_cache is not None and all(
+            cached is current
+            for cached, current in zip(self._cached_settings, self._settings_snapshot())
+        )
+
+    def _ensure_output_directory(self) -> None:
+        """Resolve output_directory to an absolute path and create it."""
         if self.output_directory is None:
             self.output_directory = os.path.expanduser(os.getenv("DMC_OUTPUT_DIRECTORY", "~/dshield-mcp-output"))
         self.output_directory = os.path.expandvars(self.output_directory)
         self.output_directory = os.path.abspath(self.output_directory)
         os.makedirs(self.output_directory, exist_ok=True)
+        self._invalidate_caches()
+
+    @property
+    def op_secrets(self) -> OnePasswordSecrets:
+        """Get the OnePassword secrets manager, creating it on first use.
+
+        Construction probes the ``op`` CLI in a subprocess, so it is deferred
+        until a caller actually needs secret resolution.
+
+        Returns:
+            OnePasswordSecrets: The shared secrets manager for this instance
+        """
+        if self._op_secrets is None:
+            self._op_secrets = OnePasswordSecrets()
+        return self._op_secrets
 
     def _load_user_config(self) -> None:
         """Load user configuration from multiple sources with precedence.
@@ -285,7 +745,9 @@ class UserConfigManager:
         
         # Validate all settings
         self._validate_settings()
-        
+        _set_log_threshold(self.logging_settings.log_level)
+        self._invalidate_caches()
+
     def _load_user_config_file(self) -> Dict[str, Any]:
         """Load user configuration from file.
         
@@ -294,24 +756,38 @@ class UserConfigManager:
         - Config directory: config/user_config.yaml
         - Home directory: ~/.dshield-mcp/user_config.yaml
         
+        Parsed files are cached per process and reused until the file's
+        inode, modification time, or size changes.
+        
         Returns:
             Dictionary containing user configuration or empty dict if not found
         """
-        user_config_paths = [
-            Path("user_config.yaml"),
-            Path("config/user_config.yaml"),
-            Path.home() / ".dshield-mcp" / "user_config.yaml"
-        ]
-        
-        for config_path in user_config_paths:
-            if config_path.exists():
-                try:
-                    with open(config_path, 'r') as f:
-                        config = yaml.safe_load(f)
-                    logger.info(f"Loaded user config from: {config_path}")
-                    return config or {}
-                except Exception as e:
-                    logger.warning(f"Failed to load user config from {config_path}: {e}")
+        for config_path in _USER_CONFIG_CANDIDATES:
+            try:
+                st = os.stat(config_path)
+            except OSError:
+                continue
+            
+            # Identify the file revision so unchanged files are not re-parsed
+            file_key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = _user_config_file_cache.get(config_path)
+            if cached is not None and cached[0] == file_key:
+                return copy.deepcopy(cached[1])
+            
+            try:
+                with open(config_path, 'rb') as f:
+                    if st.st_size > _MMAP_THRESHOLD_BYTES:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            config = yaml.load(mm, Loader=_YamlLoader) or {}
+                    else:
+                        config = yaml.load(f, Loader=_YamlLoader) or {}
+                if _should_log("INFO"):
+                    logger.info("Loaded user config", path=str(config_path))
+                _user_config_file_cache[config_path] = (file_key, config)
+                return copy.deepcopy(config)
+            except Exception as e:
+                if _should_log("WARNING"):
+                    logger.warning("Failed to load user config", path=str(config_path), error=str(e))
         
         return {}
     
@@ -321,73 +797,16 @@ class UserConfigManager:
         Reads environment variables and applies them to the appropriate
         settings categories, overriding file-based configuration.
         """
-        # Query Settings
-        self.query_settings.default_page_size = int(os.getenv("DEFAULT_PAGE_SIZE", self.query_settings.default_page_size))
-        self.query_settings.max_page_size = int(os.getenv("MAX_PAGE_SIZE", self.query_settings.max_page_size))
-        self.query_settings.default_timeout_seconds = int(os.getenv("DEFAULT_TIMEOUT_SECONDS", self.query_settings.default_timeout_seconds))
-        self.query_settings.max_timeout_seconds = int(os.getenv("MAX_TIMEOUT_SECONDS", self.query_settings.max_timeout_seconds))
-        self.query_settings.enable_smart_optimization = os.getenv("ENABLE_SMART_OPTIMIZATION", str(self.query_settings.enable_smart_optimization)).lower() == "true"
-        self.query_settings.fallback_strategy = os.getenv("FALLBACK_STRATEGY", self.query_settings.fallback_strategy)
-        self.query_settings.max_query_complexity = int(os.getenv("MAX_QUERY_COMPLEXITY", self.query_settings.max_query_complexity))
-        
-        # Pagination Settings
-        self.pagination_settings.default_method = os.getenv("PAGINATION_METHOD", self.pagination_settings.default_method)
-        self.pagination_settings.max_pages_per_request = int(os.getenv("MAX_PAGES_PER_REQUEST", self.pagination_settings.max_pages_per_request))
-        self.pagination_settings.cursor_timeout_seconds = int(os.getenv("CURSOR_TIMEOUT_SECONDS", self.pagination_settings.cursor_timeout_seconds))
-        self.pagination_settings.enable_metadata = os.getenv("ENABLE_PAGINATION_METADATA", str(self.pagination_settings.enable_metadata)).lower() == "true"
-        self.pagination_settings.include_performance_metrics = os.getenv("INCLUDE_PERFORMANCE_METRICS", str(self.pagination_settings.include_performance_metrics)).lower() == "true"
-        
-        # Streaming Settings
-        self.streaming_settings.default_chunk_size = int(os.getenv("DEFAULT_CHUNK_SIZE", self.streaming_settings.default_chunk_size))
-        self.streaming_settings.max_chunk_size = int(os.getenv("MAX_CHUNK_SIZE", self.streaming_settings.max_chunk_size))
-        session_fields = os.getenv("SESSION_CONTEXT_FIELDS")
-        if session_fields:
-            self.streaming_settings.session_context_fields = [f.strip() for f in session_fields.split(",")]
-        self.streaming_settings.enable_session_summaries = os.getenv("ENABLE_SESSION_SUMMARIES", str(self.streaming_settings.enable_session_summaries)).lower() == "true"
-        self.streaming_settings.session_timeout_minutes = int(os.getenv("SESSION_TIMEOUT_MINUTES", self.streaming_settings.session_timeout_minutes))
-        
-        # Performance Settings
-        self.performance_settings.enable_caching = os.getenv("ENABLE_CACHING", str(self.performance_settings.enable_caching)).lower() == "true"
-        self.performance_settings.cache_ttl_seconds = int(os.getenv("CACHE_TTL_SECONDS", self.performance_settings.cache_ttl_seconds))
-        self.performance_settings.max_cache_size = int(os.getenv("MAX_CACHE_SIZE", self.performance_settings.max_cache_size))
-        self.performance_settings.enable_connection_pooling = os.getenv("ENABLE_CONNECTION_POOLING", str(self.performance_settings.enable_connection_pooling)).lower() == "true"
-        self.performance_settings.connection_pool_size = int(os.getenv("CONNECTION_POOL_SIZE", self.performance_settings.connection_pool_size))
-        self.performance_settings.request_timeout_seconds = int(os.getenv("REQUEST_TIMEOUT_SECONDS", self.performance_settings.request_timeout_seconds))
-        self.performance_settings.enable_sqlite_cache = os.getenv("ENABLE_SQLITE_CACHE", str(self.performance_settings.enable_sqlite_cache)).lower() == "true"
-        self.performance_settings.sqlite_cache_ttl_hours = int(os.getenv("SQLITE_CACHE_TTL_HOURS", self.performance_settings.sqlite_cache_ttl_hours))
-        self.performance_settings.sqlite_cache_db_name = os.getenv("SQLITE_CACHE_DB_NAME", self.performance_settings.sqlite_cache_db_name)
-        
-        # Security Settings
-        self.security_settings.rate_limit_requests_per_minute = int(os.getenv("RATE_LIMIT_REQUESTS_PER_MINUTE", self.security_settings.rate_limit_requests_per_minute))
-        self.security_settings.max_query_results = int(os.getenv("MAX_QUERY_RESULTS", self.security_settings.max_query_results))
-        self.security_settings.enable_field_validation = os.getenv("ENABLE_FIELD_VALIDATION", str(self.security_settings.enable_field_validation)).lower() == "true"
-        allowed_patterns = os.getenv("ALLOWED_FIELD_PATTERNS")
-        if allowed_patterns:
-            self.security_settings.allowed_field_patterns = [p.strip() for p in allowed_patterns.split(",")]
-        self.security_settings.block_sensitive_fields = os.getenv("BLOCK_SENSITIVE_FIELDS", str(self.security_settings.block_sensitive_fields)).lower() == "true"
-        sensitive_patterns = os.getenv("SENSITIVE_FIELD_PATTERNS")
-        if sensitive_patterns:
-            self.security_settings.sensitive_field_patterns = [p.strip() for p in sensitive_patterns.split(",")]
-        
-        # Logging Settings
-        self.logging_settings.log_level = os.getenv("LOG_LEVEL", self.logging_settings.log_level)
-        self.logging_settings.log_format = os.getenv("LOG_FORMAT", self.logging_settings.log_format)
-        self.logging_settings.enable_query_logging = os.getenv("ENABLE_QUERY_LOGGING", str(self.logging_settings.enable_query_logging)).lower() == "true"
-        self.logging_settings.enable_performance_logging = os.getenv("ENABLE_PERFORMANCE_LOGGING", str(self.logging_settings.enable_performance_logging)).lower() == "true"
-        self.logging_settings.log_sensitive_data = os.getenv("LOG_SENSITIVE_DATA", str(self.logging_settings.log_sensitive_data)).lower() == "true"
-        self.logging_settings.max_log_size_mb = int(os.getenv("MAX_LOG_SIZE_MB", self.logging_settings.max_log_size_mb))
-        
-        # Campaign Settings
-        self.campaign_settings.correlation_window_minutes = int(os.getenv("CORRELATION_WINDOW_MINUTES", self.campaign_settings.correlation_window_minutes))
-        self.campaign_settings.min_confidence_threshold = float(os.getenv("MIN_CONFIDENCE_THRESHOLD", self.campaign_settings.min_confidence_threshold))
-        self.campaign_settings.max_campaign_events = int(os.getenv("MAX_CAMPAIGN_EVENTS", self.campaign_settings.max_campaign_events))
-        self.campaign_settings.enable_geospatial_correlation = os.getenv("ENABLE_GEOSPATIAL_CORRELATION", str(self.campaign_settings.enable_geospatial_correlation)).lower() == "true"
-        self.campaign_settings.enable_infrastructure_correlation = os.getenv("ENABLE_INFRASTRUCTURE_CORRELATION", str(self.campaign_settings.enable_infrastructure_correlation)).lower() == "true"
-        self.campaign_settings.enable_behavioral_correlation = os.getenv("ENABLE_BEHAVIORAL_CORRELATION", str(self.campaign_settings.enable_behavioral_correlation)).lower() == "true"
-        self.campaign_settings.enable_temporal_correlation = os.getenv("ENABLE_TEMPORAL_CORRELATION", str(self.campaign_settings.enable_temporal_correlation)).lower() == "true"
-        self.campaign_settings.enable_ip_correlation = os.getenv("ENABLE_IP_CORRELATION", str(self.campaign_settings.enable_ip_correlation)).lower() == "true"
-        self.campaign_settings.max_expansion_depth = int(os.getenv("MAX_EXPANSION_DEPTH", self.campaign_settings.max_expansion_depth))
-        self.campaign_settings.expansion_timeout_seconds = int(os.getenv("EXPANSION_TIMEOUT_SECONDS", self.campaign_settings.expansion_timeout_seconds))
+        environ = os.environ
+        overrides: Dict[str, Dict[str, Any]] = {}
+        for env_name, section, setting, parse in _ENV_OVERRIDES:
+            raw = environ.get(env_name)
+            # Empty list variables are ignored rather than clearing the list
+            if raw is None or (parse is _parse_list and not raw):
+                continue
+            overrides.setdefault(section, {})[setting] = parse(raw)
+        for attr, changes in overrides.items():
+            setattr(self, attr, dataclasses.replace(getattr(self, attr), **changes))
     
     def _apply_user_config(self, user_config: Dict[str, Any]) -> None:
         """Apply user configuration file settings.
@@ -395,84 +814,17 @@ class UserConfigManager:
         Args:
             user_config: User configuration dictionary
         """
-        # Query Settings
-        if "query" in user_config:
-            query_config = user_config["query"]
-            self.query_settings.default_page_size = query_config.get("default_page_size", self.query_settings.default_page_size)
-            self.query_settings.max_page_size = query_config.get("max_page_size", self.query_settings.max_page_size)
-            self.query_settings.default_timeout_seconds = query_config.get("default_timeout_seconds", self.query_settings.default_timeout_seconds)
-            self.query_settings.max_timeout_seconds = query_config.get("max_timeout_seconds", self.query_settings.max_timeout_seconds)
-            self.query_settings.enable_smart_optimization = query_config.get("enable_smart_optimization", self.query_settings.enable_smart_optimization)
-            self.query_settings.fallback_strategy = query_config.get("fallback_strategy", self.query_settings.fallback_strategy)
-            self.query_settings.max_query_complexity = query_config.get("max_query_complexity", self.query_settings.max_query_complexity)
-        
-        # Pagination Settings
-        if "pagination" in user_config:
-            pagination_config = user_config["pagination"]
-            self.pagination_settings.default_method = pagination_config.get("default_method", self.pagination_settings.default_method)
-            self.pagination_settings.max_pages_per_request = pagination_config.get("max_pages_per_request", self.pagination_settings.max_pages_per_request)
-            self.pagination_settings.cursor_timeout_seconds = pagination_config.get("cursor_timeout_seconds", self.pagination_settings.cursor_timeout_seconds)
-            self.pagination_settings.enable_metadata = pagination_config.get("enable_metadata", self.pagination_settings.enable_metadata)
-            self.pagination_settings.include_performance_metrics = pagination_config.get("include_performance_metrics", self.pagination_settings.include_performance_metrics)
-        
-        # Streaming Settings
-        if "streaming" in user_config:
-            streaming_config = user_config["streaming"]
-            self.streaming_settings.default_chunk_size = streaming_config.get("default_chunk_size", self.streaming_settings.default_chunk_size)
-            self.streaming_settings.max_chunk_size = streaming_config.get("max_chunk_size", self.streaming_settings.max_chunk_size)
-            if "session_context_fields" in streaming_config:
-                self.streaming_settings.session_context_fields = streaming_config["session_context_fields"]
-            self.streaming_settings.enable_session_summaries = streaming_config.get("enable_session_summaries", self.streaming_settings.enable_session_summaries)
-            self.streaming_settings.session_timeout_minutes = streaming_config.get("session_timeout_minutes", self.streaming_settings.session_timeout_minutes)
-        
-        # Performance Settings
-        if "performance" in user_config:
-            performance_config = user_config["performance"]
-            self.performance_settings.enable_caching = performance_config.get("enable_caching", self.performance_settings.enable_caching)
-            self.performance_settings.cache_ttl_seconds = performance_config.get("cache_ttl_seconds", self.performance_settings.cache_ttl_seconds)
-            self.performance_settings.max_cache_size = performance_config.get("max_cache_size", self.performance_settings.max_cache_size)
-            self.performance_settings.enable_connection_pooling = performance_config.get("enable_connection_pooling", self.performance_settings.enable_connection_pooling)
-            self.performance_settings.connection_pool_size = performance_config.get("connection_pool_size", self.performance_settings.connection_pool_size)
-            self.performance_settings.request_timeout_seconds = performance_config.get("request_timeout_seconds", self.performance_settings.request_timeout_seconds)
-            self.performance_settings.enable_sqlite_cache = performance_config.get("enable_sqlite_cache", self.performance_settings.enable_sqlite_cache)
-            self.performance_settings.sqlite_cache_ttl_hours = performance_config.get("sqlite_cache_ttl_hours", self.performance_settings.sqlite_cache_ttl_hours)
-            self.performance_settings.sqlite_cache_db_name = performance_config.get("sqlite_cache_db_name", self.performance_settings.sqlite_cache_db_name)
-        
-        # Security Settings
-        if "security" in user_config:
-            security_config = user_config["security"]
-            self.security_settings.rate_limit_requests_per_minute = security_config.get("rate_limit_requests_per_minute", self.security_settings.rate_limit_requests_per_minute)
-            self.security_settings.max_query_results = security_config.get("max_query_results", self.security_settings.max_query_results)
-            self.security_settings.enable_field_validation = security_config.get("enable_field_validation", self.security_settings.enable_field_validation)
-            if "allowed_field_patterns" in security_config:
-                self.security_settings.allowed_field_patterns = security_config["allowed_field_patterns"]
-            self.security_settings.block_sensitive_fields = security_config.get("block_sensitive_fields", self.security_settings.block_sensitive_fields)
-            if "sensitive_field_patterns" in security_config:
-                self.security_settings.sensitive_field_patterns = security_config["sensitive_field_patterns"]
-        
-        # Logging Settings
-        if "logging" in user_config:
-            logging_config = user_config["logging"]
-            self.logging_settings.log_level = logging_config.get("log_level", self.logging_settings.log_level)
-            self.logging_settings.log_format = logging_config.get("log_format", self.logging_settings.log_format)
-            self.logging_settings.enable_query_logging = logging_config.get("enable_query_logging", self.logging_settings.enable_query_logging)
-            self.logging_settings.enable_performance_logging = logging_config.get("enable_performance_logging", self.logging_settings.enable_performance_logging)
-            self.logging_settings.log_sensitive_data = logging_config.get("log_sensitive_data", self.logging_settings.log_sensitive_data)
-            self.logging_settings.max_log_size_mb = logging_config.get("max_log_size_mb", self.logging_settings.max_log_size_mb)
-        
-        # Campaign Settings
-        if "campaign" in user_config:
-            campaign_config = user_config["campaign"]
-            self.campaign_settings.correlation_window_minutes = campaign_config.get("correlation_window_minutes", self.campaign_settings.correlation_window_minutes)
-            self.campaign_settings.min_confidence_threshold = campaign_config.get("min_confidence_threshold", self.campaign_settings.min_confidence_threshold)
-            self.campaign_settings.max_campaign_events = campaign_config.get("max_campaign_events", self.campaign_settings.max_campaign_events)
-            self.campaign_settings.enable_geospatial_correlation = campaign_config.get("enable_geospatial_correlation", self.campaign_settings.enable_geospatial_correlation)
-            self.campaign_settings.enable_infrastructure_correlation = campaign_config.get("enable_infrastructure_correlation", self.campaign_settings.enable_infrastructure_correlation)
-            self.campaign_settings.enable_behavioral_correlation = campaign_config.get("enable_behavioral_correlation", self.campaign_settings.enable_behavioral_correlation)
-            self.campaign_settings.enable_temporal_correlation = campaign_config.get("enable_temporal_correlation", self.campaign_settings.enable_temporal_correlation)
-            self.campaign_settings.enable_ip_correlation = campaign_config.get("enable_ip_correlation", self.campaign_settings.enable_ip_correlation)
-            self.campaign_settings.max_expansion_depth = campaign_config.get("max_expansion_depth", self.campaign_settings.max_expansion_depth)
-            self.campaign_settings.expansion_timeout_seconds = campaign_config.get("expansion_timeout_seconds", self.campaign_settings.expansion_timeout_seconds)
+        for section, attr in _SECTION_MAP.items():
+            section_config = user_config.get(section)
+            if not section_config:
+                continue
+            changes = {
+                setting: section_config[setting]
+                for setting in _FIELDS_BY_SECTION[section]
+                if setting in section_config
+            }
+            if changes:
+                setattr(self, attr, dataclasses.replace(getattr(self, attr), **changes))
     
     def _validate_settings(self) -> None:
         """Validate all settings for consistency and correctness.
@@ -486,60 +838,25 @@ class UserConfigManager:
         errors = []
         warnings = []
         
-        # Query Settings Validation
-        if self.query_settings.default_page_size > self.query_settings.max_page_size:
-            errors.append("default_page_size cannot be greater than max_page_size")
-        if self.query_settings.default_timeout_seconds > self.query_settings.max_timeout_seconds:
-            errors.append("default_timeout_seconds cannot be greater than max_timeout_seconds")
-        if self.query_settings.fallback_strategy not in ["aggregate", "sample", "error"]:
-            errors.append("fallback_strategy must be one of: aggregate, sample, error")
-        
-        # Pagination Settings Validation
-        if self.pagination_settings.default_method not in ["page", "cursor"]:
-            errors.append("pagination_method must be one of: page, cursor")
-        if self.pagination_settings.max_pages_per_request <= 0:
-            errors.append("max_pages_per_request must be positive")
-        
-        # Streaming Settings Validation
-        if self.streaming_settings.default_chunk_size > self.streaming_settings.max_chunk_size:
-            errors.append("default_chunk_size cannot be greater than max_chunk_size")
-        if self.streaming_settings.session_timeout_minutes <= 0:
-            errors.append("session_timeout_minutes must be positive")
-        
-        # Performance Settings Validation
-        if self.performance_settings.cache_ttl_seconds <= 0:
-            errors.append("cache_ttl_seconds must be positive")
-        if self.performance_settings.max_cache_size <= 0:
-            errors.append("max_cache_size must be positive")
-        if self.performance_settings.connection_pool_size <= 0:
-            errors.append("connection_pool_size must be positive")
-        
-        # Security Settings Validation
-        if self.security_settings.rate_limit_requests_per_minute <= 0:
-            errors.append("rate_limit_requests_per_minute must be positive")
-        if self.security_settings.max_query_results <= 0:
-            errors.append("max_query_results must be positive")
-        
-        # Logging Settings Validation
-        valid_log_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
-        if self.logging_settings.log_level.upper() not in valid_log_levels:
-            errors.append(f"log_level must be one of: {', '.join(valid_log_levels)}")
-        if self.logging_settings.log_format not in ["json", "text"]:
-            errors.append("log_format must be one of: json, text")
-        if self.logging_settings.max_log_size_mb <= 0:
-            errors.append("max_log_size_mb must be positive")
-        
-        # Campaign Settings Validation
-        if self.campaign_settings.correlation_window_minutes <= 0:
-            errors.append("correlation_window_minutes must be positive")
-        if not 0.0 <= self.campaign_settings.min_confidence_threshold <= 1.0:
-            errors.append("min_confidence_threshold must be between 0.0 and 1.0")
-        if self.campaign_settings.max_campaign_events <= 0:
-            errors.append("max_campaign_events must be positive")
-        if self.campaign_settings.max_expansion_depth <= 0:
-            errors.append("max_expansion_depth must be positive")
-        if self.campaign_settings.expansion_timeout_seconds <= 0:
-            errors.append("expansion_timeout_seconds must be positive")
+        for section, lower, upper in _ORDERED_FIELDS:
+            settings_obj = getattr(self, section)
+            if getattr(settings_obj, lower) > getattr(settings_obj, upper):
+                errors.append(f"{lower} cannot be greater than {upper}")
+        
+        for section, setting, choices, message in _ENUM_FIELDS:
+            if getattr(getattr(self, section), setting) not in choices:
+                errors.append(message)
+        
+        if self.logging_settings.log_level.upper() not in _LOG_LEVELS:
+            errors.append("log_level must be one of: DEBUG, INFO, WARNING, ERROR, CRITICAL")
+        
+        for section, setting in _POSITIVE_FIELDS:
+            if getattr(getattr(self, section), setting) <= 0:
+                errors.append(f"{setting} must be positive")
+        
+        for section, setting, low, high in _BOUNDED_FIELDS:
+            if not low <= getattr(getattr(self, section), setting) <= high:
+                errors.append(f"{setting} must be between {low} and {high}")
         
         # Log errors and warnings
         if errors:
@@ -562,21 +879,11 @@ class UserConfigManager:
         Raises:
             KeyError: If category or setting does not exist
         """
-        settings_map = {
-            "query": self.query_settings,
-            "pagination": self.pagination_settings,
-            "streaming": self.streaming_settings,
-            "performance": self.performance_settings,
-            "security": self.security_settings,
-            "logging": self.logging_settings,
-            "campaign": self.campaign_settings
-        }
-        
-        if category not in settings_map:
+        if category not in _SECTION_MAP:
             raise ValueError(f"Unknown category: {category}")
         
-        settings_obj = settings_map[category]
-        if not hasattr(settings_obj, setting):
+        settings_obj = getattr(self, _SECTION_MAP[category])
+        if setting not in _FIELDS_BY_SECTION[category]:
             raise ValueError(f"Unknown setting: {category}.{setting}")
         
         return getattr(settings_obj, setting)
@@ -593,189 +900,141 @@ class UserConfigManager:
             KeyError: If category or setting does not exist
             ValueError: If value is invalid for the setting
         """
-        settings_map = {
-            "query": self.query_settings,
-            "pagination": self.pagination_settings,
-            "streaming": self.streaming_settings,
-            "performance": self.performance_settings,
-            "security": self.security_settings,
-            "logging": self.logging_settings,
-            "campaign": self.campaign_settings
-        }
-        
-        if category not in settings_map:
+        if category not in _SECTION_MAP:
             raise ValueError(f"Unknown category: {category}")
         
-        settings_obj = settings_map[category]
-        if not hasattr(settings_obj, setting):
+        attr = _SECTION_MAP[category]
+        if setting not in _FIELDS_BY_SECTION[category]:
             raise ValueError(f"Unknown setting: {category}.{setting}")
         
-        setattr(settings_obj, setting, value)
+        setattr(self, attr, dataclasses.replace(getattr(self, attr), **{setting: value}))
+        self._invalidate_caches()
         self._validate_settings()
-        logger.info(f"Updated setting: {category}.{setting} = {value}")
+        if category == "logging" and setting == "log_level":
+            _set_log_threshold(value)
+        if _should_log("INFO"):
+            logger.info("Updated setting", category=category, setting=setting, value=value)
     
     def export_config(self) -> Dict[str, Any]:
         """Export current configuration as a dictionary.
         
+        The export is cached alongside the environment variable mapping until
+        settings change; each call returns fresh section dictionaries and
+        list values, so callers never share state with the live settings.
+        
         Returns:
             Dictionary containing all current configuration settings
         """
+        if not self._caches_current():
+            self._walk_config()
         return {
-            "output_directory": self.output_directory,
-            "query": {
-                "default_page_size": self.query_settings.default_page_size,
-                "max_page_size": self.query_settings.max_page_size,
-                "default_timeout_seconds": self.query_settings.default_timeout_seconds,
-                "max_timeout_seconds": self.query_settings.max_timeout_seconds,
-                "enable_smart_optimization": self.query_settings.enable_smart_optimization,
-                "fallback_strategy": self.query_settings.fallback_strategy,
-                "max_query_complexity": self.query_settings.max_query_complexity
-            },
-            "pagination": {
-                "default_method": self.pagination_settings.default_method,
-                "max_pages_per_request": self.pagination_settings.max_pages_per_request,
-                "cursor_timeout_seconds": self.pagination_settings.cursor_timeout_seconds,
-                "enable_metadata": self.pagination_settings.enable_metadata,
-                "include_performance_metrics": self.pagination_settings.include_performance_metrics
-            },
-            "streaming": {
-                "default_chunk_size": self.streaming_settings.default_chunk_size,
-                "max_chunk_size": self.streaming_settings.max_chunk_size,
-                "session_context_fields": self.streaming_settings.session_context_fields,
-                "enable_session_summaries": self.streaming_settings.enable_session_summaries,
-                "session_timeout_minutes": self.streaming_settings.session_timeout_minutes
-            },
-            "performance": {
-                "enable_caching": self.performance_settings.enable_caching,
-                "cache_ttl_seconds": self.performance_settings.cache_ttl_seconds,
-                "max_cache_size": self.performance_settings.max_cache_size,
-                "enable_connection_pooling": self.performance_settings.enable_connection_pooling,
-                "connection_pool_size": self.performance_settings.connection_pool_size,
-                "request_timeout_seconds": self.performance_settings.request_timeout_seconds,
-                "enable_sqlite_cache": self.performance_settings.enable_sqlite_cache,
-                "sqlite_cache_ttl_hours": self.performance_settings.sqlite_cache_ttl_hours,
-                "sqlite_cache_db_name": self.performance_settings.sqlite_cache_db_name
-            },
-            "security": {
-                "rate_limit_requests_per_minute": self.security_settings.rate_limit_requests_per_minute,
-                "max_query_results": self.security_settings.max_query_results,
-                "enable_field_validation": self.security_settings.enable_field_validation,
-                "allowed_field_patterns": self.security_settings.allowed_field_patterns,
-                "block_sensitive_fields": self.security_settings.block_sensitive_fields,
-                "sensitive_field_patterns": self.security_settings.sensitive_field_patterns
-            },
-            "logging": {
-                "log_level": self.logging_settings.log_level,
-                "log_format": self.logging_settings.log_format,
-                "enable_query_logging": self.logging_settings.enable_query_logging,
-                "enable_performance_logging": self.logging_settings.enable_performance_logging,
-                "log_sensitive_data": self.logging_settings.log_sensitive_data,
-                "max_log_size_mb": self.logging_settings.max_log_size_mb
-            },
-            "campaign": {
-                "correlation_window_minutes": self.campaign_settings.correlation_window_minutes,
-                "min_confidence_threshold": self.campaign_settings.min_confidence_threshold,
-                "max_campaign_events": self.campaign_settings.max_campaign_events,
-                "enable_geospatial_correlation": self.campaign_settings.enable_geospatial_correlation,
-                "enable_infrastructure_correlation": self.campaign_settings.enable_infrastructure_correlation,
-                "enable_behavioral_correlation": self.campaign_settings.enable_behavioral_correlation,
-                "enable_temporal_correlation": self.campaign_settings.enable_temporal_correlation,
-                "enable_ip_correlation": self.campaign_settings.enable_ip_correlation,
-                "max_expansion_depth": self.campaign_settings.max_expansion_depth,
-                "expansion_timeout_seconds": self.campaign_settings.expansion_timeout_seconds
-            }
+            key: {
+                name: list(item) if isinstance(item, list) else item
+                for name, item in value.items()
+            } if isinstance(value, dict) else value
+            for key, value in self._export_cache.items()
         }
     
+    def _walk_config(self) -> None:
+        """Populate the export and environment variable caches in one pass.
+        
+        Walks _CONFIG_SCHEMA once, reading each setting a single time and
+        recording it both in the nested export layout and as a flat
+        environment variable string.
+        """
+        export: Dict[str, Any] = {"output_directory": self.output_directory}
+        env: Dict[str, str] = {}
+        for section, attr, names, getter, env_names, formatters in _CONFIG_SCHEMA:
+            values = getter(getattr(self, attr))
+            export[section] = dict(zip(names, values))
+            env.update(zip(env_names, [fmt(value) for fmt, value in zip(formatters, values)]))
+        self._export_cache = export
+        self._env_cache = env
+        self._env_view = MappingProxyType(env)
+        self._cached_settings = self._settings_snapshot()
+    
+    @classmethod
+    def _default_config_path(cls) -> Path:
+        """Get the default user config path, creating its directory once.
+        
+        Returns:
+            Path: ~/.dshield-mcp/user_config.yaml
+        """
+        if UserConfigManager._default_path_cache is None:
+            config_dir = Path.home() / ".dshield-mcp"
+            config_dir.mkdir(exist_ok=True)
+            UserConfigManager._default_path_cache = config_dir / "user_config.yaml"
+        return UserConfigManager._default_path_cache
+    
     def save_user_config(self, file_path: Optional[str] = None) -> None:
         """Save current configuration to a file.
         
+        The YAML is written to a temporary file next to the target and then
+        moved into place with os.replace(), so an interrupted save never
+        leaves a partially written configuration behind.
+        
         Args:
             file_path: Path to save the configuration file (default: auto-detected)
         """
         if file_path is None:
-            config_dir = Path.home() / ".dshield-mcp"
-            config_dir.mkdir(exist_ok=True)
-            file_path = config_dir / "user_config.yaml"
+            file_path = self._default_config_path()
+        file_path = Path(file_path)
         
         config_data = self.export_config()
         
         try:
-            with open(file_path, 'w') as f:
-                yaml.dump(config_data, f, default_flow_style=False, indent=2)
-            logger.info(f"Saved user configuration to: {file_path}")
+            payload = yaml.dump(
+                config_data,
+                Dumper=_YamlDumper,
+                default_flow_style=False,
+                indent=2,
+                sort_keys=False,
+                encoding="utf-8",
+            )
+            _atomic_write(file_path, payload)
+            if _should_log("INFO"):
+                logger.info("Saved user configuration", path=str(file_path))
         except Exception as e:
-            logger.error(f"Failed to save user configuration: {e}")
+            logger.error("Failed to save user configuration", path=str(file_path), error=str(e))
             raise
     
-    def get_environment_variables(self) -> Dict[str, str]:
+    def get_environment_variables(self) -> Mapping[str, str]:
         """Get environment variables that can be used to override settings.
         
+        The mapping is built once and cached until any settings object is
+        replaced. Every caller receives the same read-only view of the cache
+        (a MappingProxyType), so no defensive copy is made per call; copy it
+        with dict() to modify.
+        
         Returns:
-            Dictionary mapping setting names to environment variable names
+            Read-only mapping of environment variable names to values
         """
-        return {
-            # Query Settings
-            "DEFAULT_PAGE_SIZE": str(self.query_settings.default_page_size),
-            "MAX_PAGE_SIZE": str(self.query_settings.max_page_size),
-            "DEFAULT_TIMEOUT_SECONDS": str(self.query_settings.default_timeout_seconds),
-            "MAX_TIMEOUT_SECONDS": str(self.query_settings.max_timeout_seconds),
-            "ENABLE_SMART_OPTIMIZATION": str(self.query_settings.enable_smart_optimization),
-            "FALLBACK_STRATEGY": self.query_settings.fallback_strategy,
-            "MAX_QUERY_COMPLEXITY": str(self.query_settings.max_query_complexity),
-            
-            # Pagination Settings
-            "PAGINATION_METHOD": self.pagination_settings.default_method,
-            "MAX_PAGES_PER_REQUEST": str(self.pagination_settings.max_pages_per_request),
-            "CURSOR_TIMEOUT_SECONDS": str(self.pagination_settings.cursor_timeout_seconds),
-            "ENABLE_PAGINATION_METADATA": str(self.pagination_settings.enable_metadata),
-            "INCLUDE_PERFORMANCE_METRICS": str(self.pagination_settings.include_performance_metrics),
-            
-            # Streaming Settings
-            "DEFAULT_CHUNK_SIZE": str(self.streaming_settings.default_chunk_size),
-            "MAX_CHUNK_SIZE": str(self.streaming_settings.max_chunk_size),
-            "SESSION_CONTEXT_FIELDS": ",".join(self.streaming_settings.session_context_fields),
-            "ENABLE_SESSION_SUMMARIES": str(self.streaming_settings.enable_session_summaries),
-            "SESSION_TIMEOUT_MINUTES": str(self.streaming_settings.session_timeout_minutes),
-            
-            # Performance Settings
-            "ENABLE_CACHING": str(self.performance_settings.enable_caching),
-            "CACHE_TTL_SECONDS": str(self.performance_settings.cache_ttl_seconds),
-            "MAX_CACHE_SIZE": str(self.performance_settings.max_cache_size),
-            "ENABLE_CONNECTION_POOLING": str(self.performance_settings.enable_connection_pooling),
-            "CONNECTION_POOL_SIZE": str(self.performance_settings.connection_pool_size),
-            "REQUEST_TIMEOUT_SECONDS": str(self.performance_settings.request_timeout_seconds),
-            "ENABLE_SQLITE_CACHE": str(self.performance_settings.enable_sqlite_cache),
-            "SQLITE_CACHE_TTL_HOURS": str(self.performance_settings.sqlite_cache_ttl_hours),
-            "SQLITE_CACHE_DB_NAME": self.performance_settings.sqlite_cache_db_name,
-            
-            # Security Settings
-            "RATE_LIMIT_REQUESTS_PER_MINUTE": str(self.security_settings.rate_limit_requests_per_minute),
-            "MAX_QUERY_RESULTS": str(self.security_settings.max_query_results),
-            "ENABLE_FIELD_VALIDATION": str(self.security_settings.enable_field_validation),
-            "ALLOWED_FIELD_PATTERNS": ",".join(self.security_settings.allowed_field_patterns),
-            "BLOCK_SENSITIVE_FIELDS": str(self.security_settings.block_sensitive_fields),
-            "SENSITIVE_FIELD_PATTERNS": ",".join(self.security_settings.sensitive_field_patterns),
-            
-            # Logging Settings
-            "LOG_LEVEL": self.logging_settings.log_level,
-            "LOG_FORMAT": self.logging_settings.log_format,
-            "ENABLE_QUERY_LOGGING": str(self.logging_settings.enable_query_logging),
-            "ENABLE_PERFORMANCE_LOGGING": str(self.logging_settings.enable_performance_logging),
-            "LOG_SENSITIVE_DATA": str(self.logging_settings.log_sensitive_data),
-            "MAX_LOG_SIZE_MB": str(self.logging_settings.max_log_size_mb),
-            
-            # Campaign Settings
-            "CORRELATION_WINDOW_MINUTES": str(self.campaign_settings.correlation_window_minutes),
-            "MIN_CONFIDENCE_THRESHOLD": str(self.campaign_settings.min_confidence_threshold),
-            "MAX_CAMPAIGN_EVENTS": str(self.campaign_settings.max_campaign_events),
-            "ENABLE_GEOSPATIAL_CORRELATION": str(self.campaign_settings.enable_geospatial_correlation),
-            "ENABLE_INFRASTRUCTURE_CORRELATION": str(self.campaign_settings.enable_infrastructure_correlation),
-            "ENABLE_BEHAVIORAL_CORRELATION": str(self.campaign_settings.enable_behavioral_correlation),
-            "ENABLE_TEMPORAL_CORRELATION": str(self.campaign_settings.enable_temporal_correlation),
-            "ENABLE_IP_CORRELATION": str(self.campaign_settings.enable_ip_correlation),
-            "MAX_EXPANSION_DEPTH": str(self.campaign_settings.max_expansion_depth),
-            "EXPANSION_TIMEOUT_SECONDS": str(self.campaign_settings.expansion_timeout_seconds)
-        }
+        if not self._caches_current():
+            self._walk_config()
+        return self._env_view
+
+    def get_environment_block(self) -> bytes:
+        """Get the environment variables as ``KEY=value`` lines.
+        
+        Suitable for writing a .env file or feeding a subprocess environment
+        loader. Built from the cached mapping, so repeated calls are cheap.
+        
+        Returns:
+            UTF-8 encoded block with one ``KEY=value`` line per variable
+        """
+        return "".join(
+            f"{name}={value}\n" for name, value in self.get_environment_variables().items()
+        ).encode("utf-8")
+
+    def write_env_file(self, file_path: str) -> None:
+        """Write the environment variables to a .env file atomically.
+        
+        Args:
+            file_path: Destination path for the .env file
+        """
+        _atomic_write(Path(file_path), self.get_environment_block())
+        if _should_log("INFO"):
+            logger.info("Wrote environment file", path=str(file_path))
 
     def get_database_directory(self) -> str:
         """Get the database directory path.
@@ -799,18 +1058,27 @@ class UserConfigManager:
 
 # Global instance for easy access
 _user_config_manager: Optional[UserConfigManager] = None
+_user_config_lock = threading.Lock()
 
 
 def get_user_config() -> UserConfigManager:
     """Get the global user configuration manager instance.
     
+    The instance is created under a lock on first use so concurrent callers
+    never construct (and load configuration files for) more than one
+    manager; later calls return it without locking.
+    
     Returns:
         UserConfigManager: The global configuration manager instance
     """
     global _user_config_manager
-    if _user_config_manager is None:
-        _user_config_manager = UserConfigManager()
-    return _user_config_manager
+    manager = _user_config_manager
+    if manager is not None:
+        return manager
+    with _user_config_lock:
+        if _user_config_manager is None:
+            _user_config_manager = UserConfigManager()
+        return _user_config_manager
 
 
 def reset_user_config() -> None:
@@ -820,4 +1088,8 @@ def reset_user_config() -> None:
     a reload of configuration on the next get_user_config() call.
     """
     global _user_config_manager
-    _user_config_manager = None 
\ No newline at end of file
+    with _user_config_lock:
+        if _user_config_manager is not None:
+            _user_config_manager.close()
+        _user_config_manager = None
+    UserConfigManager._default_path_cache = None 
\ No newline at end of file
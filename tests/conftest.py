@@ -13,12 +13,13 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from src.models import SecurityEvent, ThreatIntelligence, DShieldAttack, DShieldReputation
 
 
-@pytest.fixture
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+def pytest_configure(config):
+    """Run the session-scoped test loop on uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 @pytest.fixture
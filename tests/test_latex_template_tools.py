@@ -6,8 +6,14 @@ document generation, template listing, schema validation, and
 error handling.
 """
 
+import asyncio
+import copy
+import errno
 import json
 import os
+import shutil
+import subprocess
+import sys
 import tempfile
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Any
@@ -16,6 +22,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 import pytest_asyncio
 
+from src import latex_template_tools
 from src.latex_template_tools import LaTeXTemplateTools
 
 if TYPE_CHECKING:
@@ -116,8 +123,7 @@ Analysis of campaign {CAMPAIGN_NAME}.
             "MCP_VERSION": "1.0.0"
         }
 
-    @pytest.mark.asyncio
-    async def test_init_with_valid_template_path(self, tmp_path: Path) -> None:
+    def test_init_with_valid_template_path(self, tmp_path: Path) -> None:
         """Test initialization with valid template path."""
         template_dir = tmp_path / "templates" / "TestTemplate"
         template_dir.mkdir(parents=True)
@@ -125,8 +131,7 @@ Analysis of campaign {CAMPAIGN_NAME}.
         tools = LaTeXTemplateTools(str(template_dir))
         assert tools.template_base_path == template_dir
 
-    @pytest.mark.asyncio
-    async def test_init_with_invalid_template_path(self, tmp_path: Path) -> None:
+    def test_init_with_invalid_template_path(self, tmp_path: Path) -> None:
         """Test initialization with invalid template path."""
         invalid_path = tmp_path / "nonexistent"
         
@@ -169,6 +174,89 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert "section_descriptions" in schema
         assert "example_data" in schema
 
+    @pytest.mark.asyncio
+    async def test_template_config_cached_until_modified(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that template_info.json is parsed once and reloaded after it changes."""
+        config_path = latex_tools.template_base_path / "template_info.json"
+        
+        with patch('src.latex_template_tools._json_loads', wraps=latex_template_tools._json_loads) as mock_loads:
+            await latex_tools.get_template_schema("Attack_Report")
+            await latex_tools.validate_document_data("Attack_Report", {})
+            await latex_tools.list_available_templates()
+            assert mock_loads.call_count == 1
+            
+            config = dict(latex_tools._load_template_config(latex_tools.template_base_path), version="3.0")
+            config_path.write_text(json.dumps(config))
+            stat = config_path.stat()
+            os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            
+            result = await latex_tools.get_template_schema("Attack_Report")
+        
+        assert mock_loads.call_count == 2
+        assert result["schema"]["version"] == "3.0"
+
+    @pytest.mark.asyncio
+    async def test_template_config_reloaded_when_mtime_preserved(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that a rewrite keeping the original mtime (e.g. cp -p) still invalidates the cache."""
+        config_path = latex_tools.template_base_path / "template_info.json"
+        await latex_tools.get_template_schema("Attack_Report")
+        
+        stat = config_path.stat()
+        config = dict(latex_tools._load_template_config(latex_tools.template_base_path), version="3.0.1")
+        config_path.write_text(json.dumps(config))
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        
+        result = await latex_tools.get_template_schema("Attack_Report")
+        
+        assert result["schema"]["version"] == "3.0.1"
+
+    @pytest.mark.asyncio
+    async def test_template_schema_not_shared_with_callers(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that mutating a returned schema or config does not change the cached template."""
+        first = (await latex_tools.get_template_schema("Attack_Report"))["schema"]
+        expected = copy.deepcopy(first)
+        first["example_data"]["REPORT_TITLE"] = "Changed by caller"
+        next(iter(first["required_variables"].values())).append("EXTRA_VARIABLE")
+        first["sections"].append("extra_section")
+        first["variable_types"]["EXTRA_VARIABLE"] = "string"
+        latex_tools._load_template_config(latex_tools.template_base_path)["required_variables"].clear()
+        
+        second = (await latex_tools.get_template_schema("Attack_Report"))["schema"]
+        
+        assert second == expected
+
+    @pytest.mark.asyncio
+    async def test_generate_document_reuses_validation(self, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
+        """Test that generate_document reuses the validation of the same variable set."""
+        with patch.object(latex_tools, '_validate_document_data', wraps=latex_tools._validate_document_data) as mock_validate:
+            validation = await latex_tools.validate_document_data("Attack_Report", sample_document_data)
+            result = await latex_tools.generate_document(
+                template_name="Attack_Report",
+                document_data=dict(sample_document_data, REPORT_TITLE="Updated Title"),
+                output_format="tex"
+            )
+            assert mock_validate.call_count == 1
+            
+            # A different set of variables is validated afresh
+            missing = await latex_tools.validate_document_data("Attack_Report", {"REPORT_TITLE": "Test"})
+        
+        assert mock_validate.call_count == 2
+        assert validation["validation"]["valid"] is True
+        assert result["success"] is True
+        assert missing["validation"]["valid"] is False
+
+    @pytest.mark.asyncio
+    async def test_cached_validation_not_shared_with_callers(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that mutating a returned validation does not change later results for the same variables."""
+        first = await latex_tools.validate_document_data("Attack_Report", {"REPORT_TITLE": "Test"})
+        first["validation"]["errors"].append("caller note")
+        first["validation"]["valid"] = True
+        
+        second = await latex_tools.validate_document_data("Attack_Report", {"REPORT_TITLE": "Other"})
+        
+        assert "caller note" not in second["validation"]["errors"]
+        assert second["validation"]["valid"] is False
+
     @pytest.mark.asyncio
     async def test_get_template_schema_invalid_template(self, latex_tools: LaTeXTemplateTools) -> None:
         """Test getting schema for invalid template."""
@@ -217,12 +305,10 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert "EXTRA_VARIABLE" in result["validation"]["unused_variables"]
 
     @pytest.mark.asyncio
-    @patch('subprocess.run')
-    async def test_generate_document_pdf_success(self, mock_run: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
+    @patch('src.latex_template_tools._find_executable', return_value="/usr/bin/pdflatex")
+    @patch.object(LaTeXTemplateTools, '_run_subprocess', new_callable=AsyncMock)
+    async def test_generate_document_pdf_success(self, mock_run: MagicMock, mock_which: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
         """Test successful PDF document generation."""
-        # Mock pdflatex availability check
-        mock_run.return_value.returncode = 0
-        
         # Mock successful compilation
         mock_run.return_value.stdout = "LaTeX compilation successful"
         mock_run.return_value.stderr = ""
@@ -248,14 +334,64 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert result["document"] is not None
         assert result["document"]["template_name"] == "Attack_Report"
         assert result["document"]["output_format"] == "pdf"
+        
+        # No cross-references: a single compile pass
+        assert mock_run.await_count == 1
 
     @pytest.mark.asyncio
-    @patch('subprocess.run')
-    async def test_generate_document_pdf_compilation_failure(self, mock_run: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
-        """Test PDF document generation with compilation failure."""
-        # Mock pdflatex availability check
+    @patch('src.latex_template_tools._find_executable', return_value="/usr/bin/pdflatex")
+    @patch.object(LaTeXTemplateTools, '_run_subprocess', new_callable=AsyncMock)
+    async def test_compile_latex_document_draft_pass_for_references(self, mock_run: AsyncMock, mock_which: MagicMock, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
+        """Test that documents with cross-references get a -draftmode pass before the final pass."""
         mock_run.return_value.returncode = 0
+        mock_run.return_value.stdout = ""
+        mock_run.return_value.stderr = ""
+        
+        temp_path = tmp_path / "temp"
+        (temp_path / "sections").mkdir(parents=True)
+        (temp_path / "main_report.tex").write_text("\\input{sections/overview}")
+        (temp_path / "sections" / "overview.tex").write_text("See Section~\\ref{sec:iocs}.")
+        (temp_path / "main_report.pdf").write_text("PDF content")
+        
+        result = await latex_tools._compile_latex_document(temp_path, {"shell_escape": True})
+        
+        assert result["success"] is True
+        draft_cmd, final_cmd = [call.args[0] for call in mock_run.await_args_list]
+        assert draft_cmd == ["pdflatex", "-interaction=nonstopmode", "-shell-escape", "-draftmode", "main_report.tex"]
+        assert final_cmd == ["pdflatex", "-interaction=nonstopmode", "-shell-escape", "main_report.tex"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tectonic_path, expected_compiler", [
+        ("/usr/bin/tectonic", "tectonic"),
+        (None, "pdflatex"),
+    ], ids=["tectonic", "fallback"])
+    @patch.object(LaTeXTemplateTools, '_run_subprocess', new_callable=AsyncMock)
+    async def test_compile_latex_document_tectonic(self, mock_run: AsyncMock, latex_tools: LaTeXTemplateTools, tmp_path: Path, tectonic_path: Any, expected_compiler: str) -> None:
+        """Test that tectonic is used when requested and installed, else pdflatex."""
+        mock_run.return_value.stdout = ""
+        mock_run.return_value.stderr = ""
+        
+        temp_path = tmp_path / "temp"
+        temp_path.mkdir()
+        (temp_path / "main_report.tex").write_text("\\begin{document}\\end{document}")
+        (temp_path / "main_report.pdf").write_text("PDF content")
         
+        executables = {"tectonic": tectonic_path, "pdflatex": "/usr/bin/pdflatex"}
+        with patch('src.latex_template_tools._find_executable', side_effect=executables.get):
+            result = await latex_tools._compile_latex_document(temp_path, {"compiler": "tectonic", "quiet": True})
+        
+        assert result["success"] is True
+        cmd, = [call.args[0] for call in mock_run.await_args_list]
+        if expected_compiler == "tectonic":
+            assert cmd == ["tectonic", "--outdir", str(temp_path), "--chatter", "minimal", "main_report.tex"]
+        else:
+            assert cmd == ["pdflatex", "-interaction=nonstopmode", "-quiet", "main_report.tex"]
+
+    @pytest.mark.asyncio
+    @patch('src.latex_template_tools._find_executable', return_value="/usr/bin/pdflatex")
+    @patch.object(LaTeXTemplateTools, '_run_subprocess', new_callable=AsyncMock)
+    async def test_generate_document_pdf_compilation_failure(self, mock_run: MagicMock, mock_which: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
+        """Test PDF document generation with compilation failure."""
         # Mock compilation failure
         mock_run.return_value.stdout = ""
         mock_run.return_value.stderr = "LaTeX compilation failed"
@@ -279,12 +415,11 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert "PDF generation failed" in result["error"]
 
     @pytest.mark.asyncio
-    @patch('subprocess.run')
-    async def test_generate_document_pdflatex_not_found(self, mock_run: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
+    @patch.dict('src.latex_template_tools._executable_paths', clear=True)
+    @patch('src.latex_template_tools.shutil.which', return_value=None)
+    @patch.object(LaTeXTemplateTools, '_run_subprocess', new_callable=AsyncMock)
+    async def test_generate_document_pdflatex_not_found(self, mock_run: MagicMock, mock_which: MagicMock, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
         """Test PDF document generation when pdflatex is not available."""
-        # Mock pdflatex not found
-        mock_run.return_value.returncode = 1
-        
         result = await latex_tools.generate_document(
             template_name="Attack_Report",
             document_data=sample_document_data,
@@ -294,6 +429,56 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert result["success"] is False
         assert "error" in result
         assert "pdflatex not found" in result["error"]
+        # The probe is a PATH lookup, not a child process
+        mock_which.assert_called_once_with("pdflatex")
+        mock_run.assert_not_awaited()
+
+    @patch.dict('src.latex_template_tools._executable_paths', clear=True)
+    def test_find_executable_caches_hits_only(self) -> None:
+        """Test that located executables are remembered while misses are looked up again."""
+        with patch('src.latex_template_tools.shutil.which', side_effect=[None, "/usr/bin/pdflatex"]) as mock_which:
+            assert latex_template_tools._find_executable("pdflatex") is None
+            assert latex_template_tools._find_executable("pdflatex") == "/usr/bin/pdflatex"
+            assert latex_template_tools._find_executable("pdflatex") == "/usr/bin/pdflatex"
+        
+        assert mock_which.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_run_subprocess(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
+        """Test that commands run asynchronously with decoded output and a timeout."""
+        result = await latex_tools._run_subprocess(
+            [sys.executable, "-c", "import os, sys; print(os.getcwd()); sys.stderr.write('warn')"],
+            cwd=tmp_path
+        )
+        
+        assert result.returncode == 0
+        assert result.stdout.strip() == str(tmp_path)
+        assert result.stderr == "warn"
+        
+        with pytest.raises(subprocess.TimeoutExpired):
+            await latex_tools._run_subprocess([sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.1)
+
+    @pytest.mark.asyncio
+    async def test_run_subprocess_killed_on_cancel(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that cancelling the caller kills the command instead of orphaning it."""
+        processes = []
+        create_subprocess_exec = asyncio.create_subprocess_exec
+        
+        async def spy(*args, **kwargs):
+            processes.append(await create_subprocess_exec(*args, **kwargs))
+            return processes[-1]
+        
+        with patch('asyncio.create_subprocess_exec', side_effect=spy):
+            task = asyncio.create_task(
+                latex_tools._run_subprocess([sys.executable, "-c", "import time; time.sleep(30)"], timeout=60)
+            )
+            while not processes:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        assert processes[0].returncode is not None
 
     @pytest.mark.asyncio
     async def test_generate_document_tex_format(self, latex_tools: LaTeXTemplateTools, sample_document_data: Dict[str, Any]) -> None:
@@ -341,8 +526,7 @@ Analysis of campaign {CAMPAIGN_NAME}.
         assert "error" in result
         assert "Invalid document data" in result["error"]
 
-    @pytest.mark.asyncio
-    async def test_variable_substitution(self, latex_tools: LaTeXTemplateTools) -> None:
+    def test_variable_substitution(self, latex_tools: LaTeXTemplateTools) -> None:
         """Test variable substitution in template content."""
         content = r"""
 \title{{{REPORT_TITLE}}}
@@ -366,12 +550,23 @@ Report Number: {{REPORT_NUMBER}}
         assert "REP-001" in processed_content
         assert "{{REPORT_TITLE}}" not in processed_content
 
-    @pytest.mark.asyncio
-    async def test_infer_variable_types(self, latex_tools: LaTeXTemplateTools) -> None:
+    def test_variable_substitution_single_pass(self, latex_tools: LaTeXTemplateTools) -> None:
+        """Test that substitution handles prefix names, non-string values and unknown placeholders."""
+        content = "{{ID}} {{ID_SUFFIX}} {{COUNT}} {{UNKNOWN}}"
+        document_data = {"ID": "{{COUNT}}", "ID_SUFFIX": "x", "COUNT": 3}
+        
+        processed_content = latex_tools._substitute_variables(content, document_data)
+        
+        # Substituted values are not rescanned for placeholders
+        assert processed_content == "{{COUNT}} x 3 {{UNKNOWN}}"
+        assert latex_tools._substitute_variables(content, {}) == content
+
+    def test_infer_variable_types(self, latex_tools: LaTeXTemplateTools) -> None:
         """Test variable type inference."""
         template_config = {
             "required_variables": {
-                "metadata": ["REPORT_DATE", "AUTHOR_NAME", "TOTAL_COUNT", "CONFIDENCE_SCORE"]
+                "metadata": ["REPORT_DATE", "AUTHOR_NAME", "TOTAL_COUNT", "CONFIDENCE_SCORE"],
+                "analysis_data": ["TOTAL_TIME", "attack_percentage"]
             }
         }
         
@@ -381,9 +576,11 @@ Report Number: {{REPORT_NUMBER}}
         assert variable_types["AUTHOR_NAME"] == "string"
         assert variable_types["TOTAL_COUNT"] == "integer"
         assert variable_types["CONFIDENCE_SCORE"] == "float"
+        # Date/time keywords take priority over integer ones; matching ignores case
+        assert variable_types["TOTAL_TIME"] == "datetime"
+        assert variable_types["attack_percentage"] == "float"
 
-    @pytest.mark.asyncio
-    async def test_generate_example_data(self, latex_tools: LaTeXTemplateTools) -> None:
+    def test_generate_example_data(self, latex_tools: LaTeXTemplateTools) -> None:
         """Test example data generation."""
         template_config = {
             "required_variables": {
@@ -400,8 +597,7 @@ Report Number: {{REPORT_NUMBER}}
         assert example_data["REPORT_DATE"] == "2024-01-15"
         assert example_data["CONFIDENCE_SCORE"] == "0.85"
 
-    @pytest.mark.asyncio
-    async def test_get_section_descriptions(self, latex_tools: LaTeXTemplateTools) -> None:
+    def test_get_section_descriptions(self, latex_tools: LaTeXTemplateTools) -> None:
         """Test section descriptions retrieval."""
         template_path = latex_tools.template_base_path
         descriptions = latex_tools._get_section_descriptions(template_path)
@@ -418,8 +614,10 @@ Report Number: {{REPORT_NUMBER}}
         source_path = latex_tools.template_base_path
         dest_path = tmp_path / "dest"
         dest_path.mkdir()
+        (source_path / "assets" / "images").mkdir()
+        (source_path / "assets" / "images" / "logo.png").write_bytes(b"\x89PNG")
         
-        latex_tools._copy_template_files(source_path, dest_path, include_assets=True)
+        await latex_tools._copy_template_files(source_path, dest_path, include_assets=True)
         
         # Check that files were copied
         assert (dest_path / "main_report.tex").exists()
@@ -427,6 +625,32 @@ Report Number: {{REPORT_NUMBER}}
         assert (dest_path / "preamble.tex").exists()
         assert (dest_path / "sections").exists()
         assert (dest_path / "sections" / "title_page.tex").exists()
+        assert (dest_path / "assets" / "images" / "logo.png").read_bytes() == b"\x89PNG"
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reflink cloning is Linux-only")
+    @pytest.mark.parametrize("clone_supported", [True, False], ids=["reflink", "fallback"])
+    def test_copy_file(self, tmp_path: Path, clone_supported: bool) -> None:
+        """Test that files are cloned when supported, else copied, keeping metadata either way."""
+        src = tmp_path / "logo.png"
+        src.write_bytes(b"\x89PNG")
+        os.utime(src, (1_000_000_000, 1_000_000_000))
+        dst = tmp_path / "copy.png"
+        
+        def fake_ioctl(dst_fd: int, request: int, src_fd: int) -> None:
+            if not clone_supported:
+                raise OSError(95, "Operation not supported")
+            os.write(dst_fd, os.read(src_fd, 1024))
+        
+        # The request number is faked, so pin it on architectures without a known FICLONE
+        with patch('src.latex_template_tools._FICLONE', 0x40049409), \
+             patch('src.latex_template_tools.fcntl.ioctl', side_effect=fake_ioctl) as mock_ioctl, \
+             patch('src.latex_template_tools.shutil.copy2', wraps=shutil.copy2) as mock_copy2:
+            latex_template_tools._copy_file(src, dst)
+        
+        mock_ioctl.assert_called_once()
+        assert mock_copy2.called is not clone_supported
+        assert dst.read_bytes() == b"\x89PNG"
+        assert dst.stat().st_mtime == 1_000_000_000
 
     @pytest.mark.asyncio
     async def test_process_template_file(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
@@ -453,6 +677,26 @@ Report Number: {{REPORT_NUMBER}}
         assert "{{AUTHOR_NAME}}" not in content
 
     @pytest.mark.asyncio
+    async def test_process_large_template_file(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
+        """Test that large template files are substituted through a memory map."""
+        padding = "% padding\n" * 8000
+        test_file = tmp_path / "large.tex"
+        test_file.write_text(padding + r"\title{{{REPORT_TITLE}}}" + "\n", encoding="utf-8")
+        untouched_file = tmp_path / "no_placeholders.tex"
+        untouched_file.write_text(padding, encoding="utf-8")
+        os.utime(untouched_file, (1_000_000_000, 1_000_000_000))
+        
+        document_data = {"REPORT_TITLE": "Rapport d'activité"}
+        
+        with patch.object(latex_tools, '_substitute_file_mmap', wraps=latex_tools._substitute_file_mmap) as mock_mmap:
+            await latex_tools._process_template_file(test_file, document_data)
+            await latex_tools._process_template_file(untouched_file, document_data)
+        
+        assert mock_mmap.call_count == 2
+        assert test_file.read_text(encoding="utf-8") == padding + r"\title{Rapport d'activité}" + "\n"
+        # Files without placeholders are left alone
+        assert untouched_file.stat().st_mtime == 1_000_000_000
+
     async def test_copy_output_files(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
         """Test output file copying."""
         # Create temporary directory with output files
@@ -463,7 +707,7 @@ Report Number: {{REPORT_NUMBER}}
         (temp_path / "main_report.pdf").write_text("PDF content")
         (temp_path / "main_report.tex").write_text("TEX content")
         
-        output_files = latex_tools._copy_output_files(temp_path, "Attack_Report")
+        output_files = await latex_tools._copy_output_files(temp_path, "Attack_Report")
         
         # Check that output files were created
         assert "pdf" in output_files
@@ -478,6 +722,30 @@ Report Number: {{REPORT_NUMBER}}
         assert pdf_path.read_text() == "PDF content"
         assert tex_path.read_text() == "TEX content" 
 
+    async def test_copy_output_files_across_filesystems(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
+        """Test that outputs are copied when they cannot be renamed into the output directory."""
+        temp_path = tmp_path / "temp"
+        temp_path.mkdir()
+        (temp_path / "main_report.pdf").write_bytes(b"%PDF-1.5")
+        
+        with patch.object(Path, 'replace', side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):
+            output_files = await latex_tools._copy_output_files(temp_path, "Attack_Report")
+        
+        assert Path(output_files["pdf"]).read_bytes() == b"%PDF-1.5"
+
+    async def test_copy_output_files_reraises_other_errors(self, latex_tools: LaTeXTemplateTools, tmp_path: Path) -> None:
+        """Test that rename failures other than a cross-device move are not retried as copies."""
+        temp_path = tmp_path / "temp"
+        temp_path.mkdir()
+        (temp_path / "main_report.pdf").write_bytes(b"%PDF-1.5")
+        
+        with patch.object(Path, 'replace', side_effect=OSError(errno.ENOSPC, "No space left on device")), \
+             patch('src.latex_template_tools._copy_file') as mock_copy:
+            with pytest.raises(OSError, match="No space left"):
+                await latex_tools._copy_output_files(temp_path, "Attack_Report")
+        
+        mock_copy.assert_not_called()
+
     def test_find_project_root_from_src_directory(self) -> None:
         """Test that project root is found correctly from src directory."""
         tools = LaTeXTemplateTools()
@@ -683,7 +951,8 @@ class TestLaTeXTemplateToolsErrorHandling:
         (temp_path / "main_report.tex").write_text("\\invalid\\command")
         
         # Mock subprocess to raise an exception
-        with patch('subprocess.run') as mock_run:
+        with patch('src.latex_template_tools._find_executable', return_value="/usr/bin/pdflatex"), \
+             patch.object(latex_tools_with_error_handler, '_run_subprocess', new_callable=AsyncMock) as mock_run:
             mock_run.side_effect = Exception("Test compilation error")
             
             result = await latex_tools_with_error_handler._compile_latex_document(temp_path, {})
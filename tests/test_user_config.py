@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""Tests for user configuration management.
+
+This module tests the UserConfigManager including user config file
+discovery, environment variable overrides, validation, and export.
+"""
+
+import dataclasses
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from src import user_config
+from src.user_config import UserConfigManager, refresh_user_config_candidates
+
+
+@pytest.fixture
+def isolated_env(tmp_path, monkeypatch):
+    """Run with an isolated HOME, working directory, and output directory."""
+    home = tmp_path / "home"
+    home.mkdir()
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    monkeypatch.setenv("DMC_OUTPUT_DIRECTORY", str(tmp_path / "output"))
+    monkeypatch.chdir(work)
+    refresh_user_config_candidates()
+    yield home
+    monkeypatch.undo()
+    refresh_user_config_candidates()
+
+
+class TestUserConfigFileDiscovery:
+    """Test user configuration file discovery."""
+
+    def test_candidates_follow_home(self, isolated_env: Path) -> None:
+        """Test that refreshed candidates resolve the current home directory."""
+        assert user_config._USER_CONFIG_CANDIDATES[-1] == (
+            isolated_env / ".dshield-mcp" / "user_config.yaml"
+        )
+
+    def test_loads_home_config(self, isolated_env: Path) -> None:
+        """Test that a user config in the home directory is applied."""
+        config_dir = isolated_env / ".dshield-mcp"
+        config_dir.mkdir()
+        with open(config_dir / "user_config.yaml", "w") as f:
+            yaml.dump({"query": {"default_page_size": 42}}, f)
+
+        manager = UserConfigManager()
+
+        assert manager.query_settings.default_page_size == 42
+
+    def test_unchanged_config_not_reparsed(self, isolated_env: Path) -> None:
+        """Test that an unchanged config file is served from the parse cache."""
+        config_file = Path("user_config.yaml")
+        with open(config_file, "w") as f:
+            yaml.dump({"query": {"default_page_size": 42}}, f)
+        UserConfigManager()
+
+        # yaml.load also backs the base config loader, so only count parses of this file
+        with patch("src.user_config.yaml.load", wraps=yaml.load) as mock_load:
+            manager = UserConfigManager()
+        user_config_parses = [
+            call for call in mock_load.call_args_list
+            if Path(str(getattr(call.args[0], "name", ""))).name == config_file.name
+        ]
+        assert user_config_parses == []
+        assert manager.query_settings.default_page_size == 42
+
+        with open(config_file, "w") as f:
+            yaml.dump({"query": {"default_page_size": 7, "max_page_size": 500}}, f)
+        manager = UserConfigManager()
+        assert manager.query_settings.default_page_size == 7
+
+    def test_large_config_loaded_via_mmap(self, isolated_env: Path, monkeypatch) -> None:
+        """Test that files above the mmap threshold parse the same way."""
+        monkeypatch.setattr(user_config, "_MMAP_THRESHOLD_BYTES", 0)
+        with open("user_config.yaml", "w") as f:
+            yaml.dump({"query": {"default_page_size": 11}}, f)
+
+        manager = UserConfigManager()
+
+        assert manager.query_settings.default_page_size == 11
+
+    def test_no_config_uses_defaults(self, isolated_env: Path) -> None:
+        """Test that defaults are used when no user config file exists."""
+        manager = UserConfigManager()
+
+        assert manager.query_settings.default_page_size == 100
+
+
+class TestLogLevelGate:
+    """Test the level gate used to skip filtered log messages."""
+
+    def test_threshold_follows_logging_settings(self, isolated_env: Path) -> None:
+        """Test that the gate tracks the configured log level."""
+        manager = UserConfigManager()
+        try:
+            manager.update_setting("logging", "log_level", "ERROR")
+            assert not user_config._should_log("INFO")
+            assert user_config._should_log("ERROR")
+        finally:
+            user_config._set_log_threshold("INFO")
+
+        assert user_config._should_log("INFO")
+
+
+class TestLazySecrets:
+    """Test deferred OnePasswordSecrets construction."""
+
+    def test_op_secrets_created_on_first_access(self, isolated_env: Path) -> None:
+        """Test that the secrets manager is only built when accessed."""
+        with patch("src.user_config.OnePasswordSecrets") as mock_secrets:
+            manager = UserConfigManager()
+            mock_secrets.assert_not_called()
+
+            first = manager.op_secrets
+            second = manager.op_secrets
+
+        mock_secrets.assert_called_once_with()
+        assert first is second
+
+
+class TestEnvironmentOverrides:
+    """Test environment variable overrides."""
+
+    @pytest.mark.parametrize("raw,expected", [
+        ("true", True), ("TRUE", True), ("1", True), ("yes", True), ("On", True),
+        ("false", False), ("0", False), ("", False),
+    ])
+    def test_parse_bool(self, raw: str, expected: bool) -> None:
+        """Test boolean parsing of environment variable values."""
+        assert user_config._parse_bool(raw) is expected
+
+    def test_overrides_applied(self, isolated_env: Path, monkeypatch) -> None:
+        """Test that set variables override defaults and unset ones do not."""
+        monkeypatch.setenv("DEFAULT_PAGE_SIZE", "25")
+        monkeypatch.setenv("ENABLE_CACHING", "false")
+        monkeypatch.setenv("SESSION_CONTEXT_FIELDS", "source.ip, host.name")
+        monkeypatch.setenv("MIN_CONFIDENCE_THRESHOLD", "0.5")
+        monkeypatch.setenv("ALLOWED_FIELD_PATTERNS", "")
+
+        manager = UserConfigManager()
+
+        assert manager.query_settings.default_page_size == 25
+        assert manager.performance_settings.enable_caching is False
+        assert manager.streaming_settings.session_context_fields == ["source.ip", "host.name"]
+        assert manager.campaign_settings.min_confidence_threshold == 0.5
+        assert manager.security_settings.allowed_field_patterns == [r"^[a-zA-Z_][a-zA-Z0-9_.]*$"]
+        assert manager.query_settings.max_page_size == 1000
+
+
+class TestValidation:
+    """Test settings validation."""
+
+    @pytest.mark.parametrize("category,setting,value,message", [
+        ("query", "default_page_size", 5000, "default_page_size cannot be greater than max_page_size"),
+        ("query", "fallback_strategy", "invalid", "fallback_strategy must be one of: aggregate, sample, error"),
+        ("pagination", "default_method", "offset", "pagination_method must be one of: page, cursor"),
+        ("logging", "log_level", "VERBOSE", "log_level must be one of: DEBUG, INFO, WARNING, ERROR, CRITICAL"),
+        ("performance", "cache_ttl_seconds", 0, "cache_ttl_seconds must be positive"),
+        ("campaign", "min_confidence_threshold", 1.5, "min_confidence_threshold must be between 0.0 and 1.0"),
+    ])
+    def test_invalid_setting_rejected(self, isolated_env: Path, category: str,
+                                      setting: str, value, message: str) -> None:
+        """Test that invalid updates raise with the expected message."""
+        manager = UserConfigManager()
+
+        with pytest.raises(ValueError, match=message):
+            manager.update_setting(category, setting, value)
+
+    def test_lowercase_log_level_accepted(self, isolated_env: Path) -> None:
+        """Test that log levels are validated case-insensitively."""
+        manager = UserConfigManager()
+        try:
+            manager.update_setting("logging", "log_level", "debug")
+        finally:
+            user_config._set_log_threshold("INFO")
+
+
+class TestExportConfig:
+    """Test configuration export."""
+
+    def test_export_contains_every_field(self, isolated_env: Path) -> None:
+        """Test that every dataclass field is exported under its section."""
+        manager = UserConfigManager()
+
+        config = manager.export_config()
+
+        assert config["output_directory"] == manager.output_directory
+        assert list(config["query"]) == [
+            "default_page_size", "max_page_size", "default_timeout_seconds",
+            "max_timeout_seconds", "enable_smart_optimization",
+            "fallback_strategy", "max_query_complexity",
+        ]
+        assert config["campaign"]["min_confidence_threshold"] == 0.7
+        assert set(config) == {
+            "output_directory", "query", "pagination", "streaming",
+            "performance", "security", "logging", "campaign",
+        }
+
+    def test_export_is_not_shared(self, isolated_env: Path) -> None:
+        """Test that mutating one export does not leak into the next."""
+        manager = UserConfigManager()
+
+        manager.export_config()["query"]["default_page_size"] = 1
+        patterns = list(manager.security_settings.allowed_field_patterns)
+        manager.export_config()["security"]["allowed_field_patterns"].append("X")
+
+        assert manager.export_config()["query"]["default_page_size"] == 100
+        assert manager.security_settings.allowed_field_patterns == patterns
+        assert manager.export_config()["security"]["allowed_field_patterns"] == patterns
+
+    def test_export_matches_environment(self, isolated_env: Path) -> None:
+        """Test that export and environment views reflect the same update."""
+        manager = UserConfigManager()
+        manager.export_config()
+        manager.get_environment_variables()
+
+        manager.update_setting("pagination", "max_pages_per_request", 4)
+
+        assert manager.export_config()["pagination"]["max_pages_per_request"] == 4
+        assert manager.get_environment_variables()["MAX_PAGES_PER_REQUEST"] == "4"
+
+    def test_unknown_setting_rejected(self, isolated_env: Path) -> None:
+        """Test that unknown categories and settings raise ValueError."""
+        manager = UserConfigManager()
+
+        with pytest.raises(ValueError, match="Unknown category"):
+            manager.get_setting("bogus", "default_page_size")
+        with pytest.raises(ValueError, match="Unknown setting"):
+            manager.get_setting("query", "bogus")
+
+
+class TestFastConstruction:
+    """Test construction paths that skip file and environment loading."""
+
+    def test_from_dict_skips_loading(self, isolated_env: Path, tmp_path: Path, monkeypatch) -> None:
+        """Test that from_dict applies only the given dictionary."""
+        monkeypatch.setenv("DEFAULT_PAGE_SIZE", "25")
+        output_dir = tmp_path / "from_dict_output"
+
+        with patch("src.user_config.get_config") as mock_get_config:
+            manager = UserConfigManager.from_dict({
+                "output_directory": str(output_dir),
+                "query": {"default_page_size": 60},
+                "streaming": {"session_context_fields": ["host.name"]},
+            })
+
+        mock_get_config.assert_not_called()
+        assert manager.query_settings.default_page_size == 60
+        assert manager.streaming_settings.session_context_fields == ["host.name"]
+        assert manager.pagination_settings.max_pages_per_request == 10
+        assert manager.output_directory == str(output_dir)
+        assert output_dir.is_dir()
+
+    def test_from_dict_round_trips_export(self, isolated_env: Path) -> None:
+        """Test that exported configuration rebuilds an equivalent manager."""
+        manager = UserConfigManager()
+        manager.update_setting("campaign", "max_expansion_depth", 5)
+
+        rebuilt = UserConfigManager.from_dict(manager.export_config())
+
+        assert rebuilt.export_config() == manager.export_config()
+
+    def test_from_dict_validates(self, isolated_env: Path) -> None:
+        """Test that from_dict rejects invalid settings."""
+        with pytest.raises(ValueError, match="fallback_strategy"):
+            UserConfigManager.from_dict({"query": {"fallback_strategy": "bogus"}})
+
+    def test_clone_is_independent(self, isolated_env: Path) -> None:
+        """Test that changes to a clone do not affect the original."""
+        manager = UserConfigManager()
+
+        clone = manager.clone()
+        clone.update_setting("query", "default_page_size", 10)
+        clone.streaming_settings.session_context_fields.append("host.name")
+
+        assert manager.query_settings.default_page_size == 100
+        assert "host.name" not in manager.streaming_settings.session_context_fields
+        assert clone.export_config()["query"]["default_page_size"] == 10
+
+
+class TestEnvironmentVariableExport:
+    """Test the cached environment variable export."""
+
+    @pytest.mark.parametrize("value,expected", [
+        (True, "True"), (False, "False"), (1, "1"), (0, "0"), (["a"], "['a']"),
+    ])
+    def test_format_bool(self, value, expected: str) -> None:
+        """Test that only real booleans are spelled True/False on export."""
+        assert user_config._format_bool(value) == expected
+
+    def test_cached_until_setting_changes(self, isolated_env: Path) -> None:
+        """Test that the mapping is reused until a setting is updated."""
+        manager = UserConfigManager()
+
+        first = manager.get_environment_variables()
+        assert manager.get_environment_variables() is first
+        assert manager._env_cache is not None
+
+        manager.update_setting("query", "default_page_size", 20)
+        updated = manager.get_environment_variables()
+
+        assert first["DEFAULT_PAGE_SIZE"] == "100"
+        assert updated["DEFAULT_PAGE_SIZE"] == "20"
+
+    def test_settings_replacement_detected(self, isolated_env: Path) -> None:
+        """Test that replacing a settings object refreshes the cache."""
+        manager = UserConfigManager()
+        manager.get_environment_variables()
+
+        manager.query_settings = dataclasses.replace(manager.query_settings, max_page_size=900)
+
+        assert manager.get_environment_variables()["MAX_PAGE_SIZE"] == "900"
+
+    def test_settings_are_frozen(self, isolated_env: Path) -> None:
+        """Test that settings can only change by replacement."""
+        manager = UserConfigManager()
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            manager.query_settings.default_page_size = 1
+
+    def test_environment_block(self, isolated_env: Path, tmp_path: Path) -> None:
+        """Test the KEY=value block and the .env file written from it."""
+        manager = UserConfigManager()
+        env_file = tmp_path / "settings.env"
+
+        block = manager.get_environment_block()
+        manager.write_env_file(str(env_file))
+
+        lines = block.decode("utf-8").splitlines()
+        assert lines[0] == "DEFAULT_PAGE_SIZE=100"
+        assert "SESSION_CONTEXT_FIELDS=source.ip,user.name,session.id" in lines
+        assert len(lines) == len(manager.get_environment_variables())
+        assert env_file.read_bytes() == block
+
+    def test_mapping_is_read_only(self, isolated_env: Path) -> None:
+        """Test that callers cannot mutate the cached mapping."""
+        manager = UserConfigManager()
+
+        env_vars = manager.get_environment_variables()
+
+        with pytest.raises(TypeError):
+            env_vars["DEFAULT_PAGE_SIZE"] = "1"
+
+
+class TestSaveUserConfig:
+    """Test saving configuration to disk."""
+
+    def test_save_round_trips(self, isolated_env: Path, tmp_path: Path) -> None:
+        """Test that a saved config file loads back to the same settings."""
+        manager = UserConfigManager()
+        manager.update_setting("query", "default_page_size", 33)
+        target = tmp_path / "saved.yaml"
+
+        manager.save_user_config(str(target))
+
+        with open(target, "r", encoding="utf-8") as f:
+            saved = yaml.safe_load(f)
+        assert saved == manager.export_config()
+        assert list(saved["query"])[0] == "default_page_size"
+
+    def test_failed_save_keeps_existing_file(self, isolated_env: Path, tmp_path: Path) -> None:
+        """Test that a failed save leaves the previous file and no temp file."""
+        manager = UserConfigManager()
+        target = tmp_path / "saved.yaml"
+        target.write_text("query:\n  default_page_size: 5\n")
+
+        with patch("src.user_config.os.replace", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                manager.save_user_config(str(target))
+
+        assert target.read_text() == "query:\n  default_page_size: 5\n"
+        assert not (tmp_path / "saved.yaml.tmp").exists()
+
+    def test_default_path_in_home(self, isolated_env: Path) -> None:
+        """Test that the default save location is under the home directory."""
+        manager = UserConfigManager()
+
+        manager.save_user_config()
+        manager.save_user_config()
+
+        assert (isolated_env / ".dshield-mcp" / "user_config.yaml").is_file()
+        assert UserConfigManager._default_path_cache == (
+            isolated_env / ".dshield-mcp" / "user_config.yaml"
+        )
+
+
+class TestGlobalInstance:
+    """Test the process-wide configuration manager."""
+
+    def test_concurrent_first_access_creates_one_manager(self, isolated_env: Path) -> None:
+        """Test that racing first calls share a single manager."""
+        user_config.reset_user_config()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker() -> None:
+            barrier.wait()
+            results.append(user_config.get_user_config())
+
+        with patch("src.user_config.UserConfigManager", wraps=UserConfigManager) as mock_cls:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert mock_cls.call_count == 1
+        assert len({id(manager) for manager in results}) == 1
+        user_config.reset_user_config()
+
+    def test_reset_closes_manager(self, isolated_env: Path) -> None:
+        """Test that resetting the global manager releases its caches."""
+        user_config.reset_user_config()
+        manager = user_config.get_user_config()
+        manager.get_environment_variables()
+
+        user_config.reset_user_config()
+
+        assert manager._env_cache is None
+        assert user_config.get_user_config() is not manager
+        user_config.reset_user_config()